@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import random
+import string
+from typing import Iterator
+
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael",
+    "Linda", "William", "Elizabeth", "David", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen", "Daniel",
+    "Nancy", "Matthew", "Lisa", "Anthony", "Betty", "Mark", "Margaret",
+    "Donald", "Sandra", "Steven", "Ashley", "Paul", "Kimberly", "Andrew",
+    "Emily", "Joshua", "Donna", "Kenneth", "Michelle",
+]  # fmt: skip
+
+ACCENTED_FIRST_NAMES = [
+    "José", "Zoë", "Renée", "Björn", "François", "Søren", "Chloé", "Jürgen",
+    "Inés", "Noël", "Agnès", "Hélène", "Ramón", "Mónica", "Łukasz", "Siân",
+]  # fmt: skip
+
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
+    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark",
+    "Ramirez", "Lewis", "Robinson", "Walker", "Young", "Allen", "King",
+    "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores",
+]  # fmt: skip
+
+ACCENTED_LAST_NAMES = [
+    "Müller", "Gómez", "Núñez", "Šimić", "Øvergård", "Côté", "Bélanger",
+    "Björklund", "Ibáñez", "Lévesque", "Dvořák", "Wójcik",
+]  # fmt: skip
+
+# A handful of surnames shared by a large share of the corpus to produce
+# heavy duplicate numbering (i.e. hundreds of jsmith's)
+COLLISION_LAST_NAMES = ["Smith", "Johnson", "Lee"]
+
+
+def generate_names(
+    count: int,
+    seed: int = 0,
+    middle_rate: float = 0.3,
+    hyphen_rate: float = 0.1,
+    collision_rate: float = 0.2,
+    accent_rate: float = 0.05,
+) -> Iterator[str]:
+    """Generate a reproducible synthetic name corpus.
+
+    Arguments:
+        count: number of names to generate
+        seed: random seed
+        middle_rate: share of names with a middle name
+        hyphen_rate: share of names with a hyphenated last name
+        collision_rate: share of names using a heavily shared surname
+        accent_rate: share of names with accented first/last names
+
+    Yields:
+        names (format: 'First (M) Last')
+    """
+    rng = random.Random(seed)
+
+    for _ in range(count):
+        accented = rng.random() < accent_rate
+
+        first = rng.choice(ACCENTED_FIRST_NAMES if accented else FIRST_NAMES)
+
+        if rng.random() < collision_rate:
+            last = rng.choice(COLLISION_LAST_NAMES)
+        else:
+            last = rng.choice(ACCENTED_LAST_NAMES if accented else LAST_NAMES)
+
+        if rng.random() < hyphen_rate:
+            last = f"{last}-{rng.choice(LAST_NAMES)}"
+
+        if rng.random() < middle_rate:
+            # Split middle names between full names and initials
+            if rng.random() < 0.5:
+                middle = rng.choice(FIRST_NAMES)
+            else:
+                middle = rng.choice(string.ascii_uppercase)
+
+            yield f"{first} {middle} {last}"
+
+        else:
+            yield f"{first} {last}"
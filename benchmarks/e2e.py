@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Benchmark the full CLI pipeline against the local replay server.
+
+Every run launches `python -m bridgekeeper` in a fresh process, pointed
+at an in-process `benchmarks.replay_server` via `--endpoint`, with the
+search engine rate limits lifted so the pipeline itself is measured
+rather than the blacklist evasion delays.
+
+    python -m benchmarks.e2e --depth 10 --output e2e.json
+    python -m benchmarks.e2e --recording run.ndjson --latency 0.05 --compare e2e.json
+    python -m benchmarks.e2e --hunter --error-rate 0.05 --captcha-rate 0.02
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    List,
+)
+
+from bridgekeeper import __version__
+from bridgekeeper.utils.defaults import SEARCH_ENGINES
+
+from benchmarks.replay_server import ReplayServer
+
+
+DEFAULT_FORMAT = "{f}{last},{first}.{last}"
+
+# Repository root, so the CLI runs from this tree even when not installed
+ROOT = str(Path(__file__).resolve().parents[1])
+
+# Effectively unlimited, the replay server answers as fast as it can
+RATE_LIMIT = 1000000
+
+
+def run_once(
+    server: ReplayServer,
+    args: argparse.Namespace,
+    output_dir: str,
+) -> Dict[str, Any]:
+    """Run the CLI pipeline once.
+
+    Arguments:
+        server: running replay server
+        args: benchmark argument namespace
+        output_dir: directory to write the CLI output to
+
+    Returns:
+        run results
+    """
+    stats_file = f"{output_dir}/stats.json"
+    command = [
+        sys.executable, "-m", "bridgekeeper",
+        "--company", args.company,
+        "--depth", str(args.depth),
+        "--output", "output",
+        "--endpoint", server.url,
+        "--rate-jitter", "0",
+        "--stats", stats_file,
+    ]  # fmt: skip
+
+    for engine in SEARCH_ENGINES:
+        command += ["--rate-limit", f"{engine}={RATE_LIMIT}"]
+
+    if args.hunter:
+        command += ["--api", "benchmark", "--domain", "example.com"]
+    else:
+        command += ["--format", args.format]
+
+    command += args.extra
+
+    # Run from the output directory, the output path is always relative
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+
+    before = Counter(server.stats)
+    start = time.perf_counter()
+    subprocess.run(
+        command,
+        cwd=output_dir,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+    elapsed = time.perf_counter() - start
+
+    served = Counter(server.stats)
+    served.subtract(before)
+
+    with open(stats_file, "r") as f:
+        stats = json.load(f)
+
+    stages = stats["stages"]
+    pages = sum(v for (k, v) in served.items() if k.startswith("pages:") and k != "pages:hunter")  # fmt: skip
+    scrape = stages.get("scrape")
+
+    return {
+        "elapsed": round(elapsed, 4),
+        "stages": stages,
+        "startup": round(elapsed - stats["elapsed"], 4),
+        "pages": pages,
+        "names": stats["names"],
+        "pages_per_sec": round(pages / scrape, 1) if scrape else None,
+        "names_per_sec": round(stats["names"] / scrape, 1) if scrape else None,
+        "served": {k: v for (k, v) in served.items() if v},
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Take the median of each metric across runs.
+
+    Arguments:
+        runs: run results
+
+    Returns:
+        median results
+    """
+
+    def median(values: List[float]) -> float:
+        values = sorted(v for v in values if v is not None)
+        if not values:
+            return None
+
+        return values[len(values) // 2]
+
+    stages = sorted({s for r in runs for s in r["stages"]})
+    return {
+        "elapsed": median([r["elapsed"] for r in runs]),
+        "startup": median([r["startup"] for r in runs]),
+        "stages": {s: median([r["stages"].get(s) for r in runs]) for s in stages},
+        "pages_per_sec": median([r["pages_per_sec"] for r in runs]),
+        "names_per_sec": median([r["names_per_sec"] for r in runs]),
+    }
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]):
+    """Print the change between two benchmark runs.
+
+    Arguments:
+        previous: previous benchmark results
+        current: current benchmark results
+    """
+    (before, after) = (previous["summary"], current["summary"])
+
+    metrics = [(k, before.get(k), after.get(k)) for k in ["elapsed", "pages_per_sec", "names_per_sec"]]  # fmt: skip
+    metrics += [(f"stage:{s}", before["stages"].get(s), t) for (s, t) in after["stages"].items()]  # fmt: skip
+
+    for (key, old, new) in metrics:
+        if not old or new is None:
+            continue
+
+        change = ((new - old) / old) * 100.0
+        print(f"{key:<18} {old:>12.4f} -> {new:>12.4f} ({change:+.1f}%)")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments
+
+    Returns:
+        argument namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="BridgeKeeper end-to-end benchmark",
+        epilog="arguments after `--` are passed to bridgekeeper as is",
+    )
+    parser.add_argument(
+        "-c",
+        "--company",
+        type=str,
+        help="target company (Default: Example Ltd.)",
+        default="Example Ltd.",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        help=f"username format(s) (comma delimited) (Default: {DEFAULT_FORMAT})",
+        default=DEFAULT_FORMAT,
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        help="number of pages deep to scrape per search engine (Default: 10)",
+        default=10,
+    )
+    parser.add_argument(
+        "--hunter",
+        action="store_true",
+        help="get the username format and emails from the Hunter.io stand-in",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        help="number of runs, the median is reported (Default: 3)",
+        default=3,
+    )
+    parser.add_argument(
+        "--recording",
+        type=str,
+        help="NDJSON recording written by `bridgekeeper --record` to replay",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        help="seconds the replay server waits before each response (Default: 0)",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        help="share of requests answered with a 503 (Default: 0)",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--captcha-rate",
+        type=float,
+        help="share of search engine requests answered with a CAPTCHA page (Default: 0)",  # fmt: skip
+        default=0.0,
+    )
+    parser.add_argument(
+        "--names",
+        type=int,
+        help="size of the replay server name corpus (Default: 1000)",
+        default=1000,
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        help="result pages per search engine (Default: --depth)",
+    )
+    parser.add_argument(
+        "--repeat-last",
+        action="store_true",
+        help="keep serving the last page past the last page",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="corpus and fault random seed (Default: 0)",
+        default=0,
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="file to write JSON results to",
+    )
+    parser.add_argument(
+        "--compare",
+        type=str,
+        help="JSON results of a previous run to compare against",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="show the bridgekeeper log output",
+    )
+
+    # Everything after `--` goes to bridgekeeper
+    argv = sys.argv[1:]
+    extra = []
+    if "--" in argv:
+        (argv, extra) = (argv[: argv.index("--")], argv[argv.index("--") + 1 :])
+
+    args = parser.parse_args(argv)
+    args.extra = extra
+    return args
+
+
+def main():
+    args = parse_args()
+
+    server = ReplayServer(
+        ("127.0.0.1", 0),
+        recording=args.recording,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        captcha_rate=args.captcha_rate,
+        pages=args.pages or args.depth,
+        names=args.names,
+        seed=args.seed,
+        repeat_last=args.repeat_last,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    results = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "company": args.company,
+        "depth": args.depth,
+        "hunter": args.hunter,
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "captcha_rate": args.captcha_rate,
+        "runs": [],
+    }
+
+    try:
+        for i in range(args.repeat):
+            with tempfile.TemporaryDirectory() as output_dir:
+                run = run_once(server, args, output_dir)
+
+            results["runs"].append(run)
+            stages = ", ".join(f"{s} {t:.4f}s" for (s, t) in run["stages"].items())
+            print(
+                f"run {i + 1}: {run['elapsed']:.4f}s wall-clock, "
+                f"{run['pages']} pages ({run['pages_per_sec']} pages/sec), "
+                f"{run['names']} names ({run['names_per_sec']} names/sec), "
+                f"startup {run['startup']:.4f}s, {stages}"
+            )
+
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    results["summary"] = summarize(results["runs"])
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(json.load(f), results)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
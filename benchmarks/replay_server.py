@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""Local stand-in for the search engines and Hunter.io.
+
+BridgeKeeper sends every request to the server with the hidden
+`--endpoint` argument, the original host becoming the first path segment
+(i.e. `/www.google.com/search?q=...`). Responses captured with `--record`
+are replayed as is, anything that was not recorded is synthesized from a
+reproducible name corpus. Latency, server errors and CAPTCHA pages can be
+injected on top of both.
+
+    python -m benchmarks.replay_server --port 8080 --recording run.ndjson
+    python -m benchmarks.replay_server --latency 0.2 --error-rate 0.05 --captcha-rate 0.01
+    bridgekeeper -c "Example Ltd." -f {f}{last} --endpoint http://127.0.0.1:8080
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+)
+from urllib.parse import (
+    parse_qsl,
+    urlencode,
+    urlsplit,
+)
+
+from bridgekeeper.utils.record import (
+    load_recording,
+    redact_url,
+)
+
+from benchmarks.corpus import generate_names
+
+
+# Search engine hosts -> source name (as recorded)
+HOSTS = {
+    "duckduckgo.com": "duckduckgo",
+    "links.duckduckgo.com": "duckduckgo",
+    "www.google.com": "google",
+    "search.yahoo.com": "yahoo",
+    "www.bing.com": "bing",
+    "api.hunter.io": "hunter",
+}
+
+# Offset of each search engine into the name corpus, so engines overlap
+# on part of the names they find like the real ones do
+ENGINE_SHIFT = {"duckduckgo": 0, "google": 1, "yahoo": 2, "bing": 3}
+
+JOB_TITLES = [
+    "Software Engineer", "Account Manager", "Director of Sales", "Analyst",
+    "Product Manager", "Recruiter", "Consultant", "Engineering Manager",
+]  # fmt: skip
+
+CAPTCHA_PAGE = (
+    "<html><body><p>Our systems have detected unusual traffic from your "
+    "computer network.</p><div id='recaptcha'>CAPTCHA</div></body></html>"
+)
+
+
+def canonical_url(url: str) -> str:
+    """Canonical form of a url to match requests against recordings,
+    independent of scheme, query parameter order and percent-encoding.
+
+    Arguments:
+        url: request url
+
+    Returns:
+        canonical url (i.e. `www.google.com/search?q=...&start=0`)
+    """
+    parts = urlsplit(redact_url(url))
+    query = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    return f"{parts.netloc}{parts.path or '/'}?{urlencode(query)}"
+
+
+def content_type(source: str, path: str) -> str:
+    """Content type a service answers a path with"""
+    if source == "hunter":
+        return "application/json; charset=utf-8"
+
+    if path.endswith(".js"):
+        return "application/javascript; charset=utf-8"
+
+    return "text/html; charset=utf-8"
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Threaded HTTP server replaying recorded responses and
+    synthesizing the rest.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        recording: str = None,
+        strict: bool = False,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        captcha_rate: float = 0.0,
+        pages: int = 10,
+        results: int = 10,
+        names: int = 1000,
+        emails: int = 250,
+        pattern: str = "{f}{last}",
+        seed: int = 0,
+        repeat_last: bool = False,
+        verbose: bool = False,
+    ):
+        """Initialize ReplayServer instance.
+
+        Arguments:
+            address: (host, port) to listen on, port 0 picks a free port
+            recording: NDJSON recording written by `bridgekeeper --record`
+            strict: answer requests missing from the recording with a 404
+              instead of synthesizing them
+            latency: seconds to wait before each response
+            latency_jitter: maximum random seconds added to the latency
+            error_rate: share of requests answered with a 503
+            captcha_rate: share of search engine requests answered with a
+              CAPTCHA page
+            pages: number of result pages per search engine before the
+              results run out
+            results: number of results per page
+            names: size of the name corpus results are drawn from
+            emails: number of emails known to the Hunter.io stand-in
+            pattern: username format reported by the Hunter.io stand-in
+            seed: random seed of the corpus and of injected faults
+            repeat_last: keep serving the last page past the last page
+              (like real search engines often do) instead of no results
+            verbose: log every request
+        """
+        super().__init__(address, ReplayHandler)
+
+        self.recording = {}
+        if recording:
+            for (url, entry) in load_recording(recording).items():
+                self.recording[canonical_url(url)] = entry
+
+        self.strict = strict
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.captcha_rate = captcha_rate
+        self.pages = pages
+        self.results = results
+        self.pattern = pattern
+        self.repeat_last = repeat_last
+        self.verbose = verbose
+
+        self.names = list(generate_names(names, seed=seed))
+        self.emails = [self.email(name) for name in self.names[:emails]]
+
+        # Faults are drawn from a single seeded generator shared by every
+        # handler thread
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    def handle_error(self, request: Any, client_address: Tuple[str, int]):
+        """Clients dropping connections is expected (i.e. cancelled
+        requests for prefetched pages past the last page)
+        """
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        """Base url to pass to `--endpoint`"""
+        (host, port) = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, *keys: str):
+        """Increment request counters"""
+        with self.lock:
+            self.stats.update(keys)
+
+    def roll(self, rate: float) -> bool:
+        """Draw whether a fault with the given rate is injected"""
+        if rate <= 0:
+            return False
+
+        with self.lock:
+            return self.random.random() < rate
+
+    def email(self, name: str) -> str:
+        """Email address of a name in the Hunter.io username format"""
+        parts = [re.sub("[^a-z]", "", p) for p in name.lower().split()]
+        parts = [p for p in parts if p] or ["user"]
+        (first, last) = (parts[0], parts[-1])
+        username = (
+            self.pattern.replace("{first}", first)
+            .replace("{last}", last)
+            .replace("{f}", first[0])
+            .replace("{l}", last[0])
+        )
+        return f"{username}@example.com"
+
+    def page_names(self, source: str, page: int, narrow: str = "") -> List[str]:
+        """Names listed on a synthesized page of a search engine, queries
+        narrowed down to a job title or location list another part of the
+        name corpus
+        """
+        if page >= self.pages and self.repeat_last:
+            page = self.pages - 1
+
+        if page < 0 or page >= self.pages:
+            return []
+
+        start = ENGINE_SHIFT[source] * (self.pages * self.results) // 2
+        if narrow:
+            start += zlib.crc32(narrow.lower().encode("utf-8"))
+        start += page * self.results
+        return [
+            self.names[(start + i) % len(self.names)] for i in range(self.results)
+        ]
+
+    def respond(self, url: str) -> Tuple[int, str, str]:
+        """Build the response to a request.
+
+        Arguments:
+            url: original request url (i.e. `https://www.google.com/search?q=...`)
+
+        Returns:
+            (status code, content type, body)
+        """
+        parts = urlsplit(url)
+        source = HOSTS.get(parts.netloc)
+        self.count("requests")
+
+        if source is None:
+            self.count("unknown")
+            return (404, "text/plain", f"Unknown host: {parts.netloc}")
+
+        if self.latency or self.latency_jitter:
+            with self.lock:
+                jitter = self.random.uniform(0, self.latency_jitter)
+
+            time.sleep(self.latency + jitter)
+
+        if self.roll(self.error_rate):
+            self.count("errors")
+            return (503, "text/plain", "Service Unavailable")
+
+        if source != "hunter" and self.roll(self.captcha_rate):
+            self.count("captchas")
+            return (200, "text/html; charset=utf-8", CAPTCHA_PAGE)
+
+        entry = self.recording.get(canonical_url(url))
+        if entry is not None:
+            self.count("recorded", f"pages:{source}")
+            return (entry["status"], content_type(source, parts.path), entry["body"])
+
+        if self.strict:
+            self.count("missing")
+            return (404, "text/plain", f"Not recorded: {redact_url(url)}")
+
+        self.count("synthesized", f"pages:{source}")
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        body = self.synthesize(source, parts.path, params)
+        return (200, content_type(source, parts.path), body)
+
+    def synthesize(self, source: str, path: str, params: Dict[str, str]) -> str:
+        """Synthesize a response in the shape each service answers with.
+
+        Arguments:
+            source: service name
+            path: request path
+            params: query parameters
+
+        Returns:
+            response body
+        """
+        if source == "hunter":
+            return self.synthesize_hunter(params)
+
+        # DuckDuckGo hands out its search token on the search page
+        if source == "duckduckgo" and not path.endswith("d.js"):
+            return "<html><script>vqd='4-1234567890';</script></html>"
+
+        query = params.get("q") or params.get("p") or ""
+        match = re.search('"- (.+?)"', query)
+        company = match.group(1) if match else "Example Ltd."
+        narrow = query[match.end() :].strip() if match else ""
+
+        if source == "duckduckgo":
+            page = int(params.get("s") or 0) // self.results
+        elif source == "google":
+            page = int(params.get("start") or 0) // 10
+        elif source == "yahoo":
+            page = (int(params.get("b") or 1) - 1) // 10
+        else:
+            page = int(params.get("first") or 0) // 14
+
+        # Names come around again once the corpus is exhausted, with another
+        # job title so the page itself is not a repeat
+        cycle = (min(page, self.pages - 1) * self.results) // len(self.names)
+        titles = [
+            f"{name} - {JOB_TITLES[(i + cycle) % len(JOB_TITLES)]} - {company} | LinkedIn"  # fmt: skip
+            for (i, name) in enumerate(self.page_names(source, page, narrow))
+        ]
+
+        if source == "duckduckgo":
+            results = [{"t": t, "u": "https://www.linkedin.com/in/x"} for t in titles]
+            if not results:
+                results = [{"t": "EOF", "u": ""}]
+
+            results = json.dumps(results, ensure_ascii=False, separators=(",", ":"))
+            return f"DDG.pageLayout.load('d',{results});"
+
+        if source == "google":
+            items = [f'<div class="g"><a href="#"><h3 class="LC20lb">{t}</h3></a></div>' for t in titles]  # fmt: skip
+        elif source == "yahoo":
+            items = [f'<li><h3 class="title"><a href="#"><span>www.linkedin.com › in</span>{t}</a></h3></li>' for t in titles]  # fmt: skip
+        else:
+            items = [f'<li class="b_algo"><h2><a href="#">{t}</a></h2></li>' for t in titles]  # fmt: skip
+
+        return f"<html><body><ol>{''.join(items)}</ol></body></html>"
+
+    def synthesize_hunter(self, params: Dict[str, str]) -> str:
+        """Synthesize a Hunter.io domain search response"""
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 10)
+
+        data = {
+            "domain": params.get("domain"),
+            "pattern": self.pattern,
+            "emails": [{"value": e} for e in self.emails[offset : offset + limit]],
+        }
+        return json.dumps({"data": data})
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Answer `/{host}{path}?{query}` requests as the original host"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        (host, _, rest) = self.path.lstrip("/").partition("/")
+        url = f"https://{host}/{rest}"
+
+        (status, type_, body) = self.server.respond(url)
+        data = body.encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", type_)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments
+
+    Returns:
+        argument namespace
+    """
+    parser = argparse.ArgumentParser(description="BridgeKeeper replay server")
+    parser.add_argument(
+        "--host",
+        type=str,
+        help="address to listen on (Default: 127.0.0.1)",
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        help="port to listen on (Default: 8080)",
+        default=8080,
+    )
+    parser.add_argument(
+        "--recording",
+        type=str,
+        help="NDJSON recording written by `bridgekeeper --record`",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="answer requests missing from the recording with a 404",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        help="seconds to wait before each response (Default: 0)",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--latency-jitter",
+        type=float,
+        help="maximum random seconds added to the latency (Default: 0)",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        help="share of requests answered with a 503 (Default: 0)",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--captcha-rate",
+        type=float,
+        help=(
+            "share of search engine requests answered with a CAPTCHA page "
+            "(Default: 0)"
+        ),
+        default=0.0,
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        help="result pages per search engine (Default: 10)",
+        default=10,
+    )
+    parser.add_argument(
+        "--results",
+        type=int,
+        help="results per page (Default: 10)",
+        default=10,
+    )
+    parser.add_argument(
+        "--names",
+        type=int,
+        help="size of the name corpus (Default: 1000)",
+        default=1000,
+    )
+    parser.add_argument(
+        "--emails",
+        type=int,
+        help="emails known to the Hunter.io stand-in (Default: 250)",
+        default=250,
+    )
+    parser.add_argument(
+        "--pattern",
+        type=str,
+        help="Hunter.io username format (Default: {f}{last})",
+        default="{f}{last}",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="corpus and fault random seed (Default: 0)",
+        default=0,
+    )
+    parser.add_argument(
+        "--repeat-last",
+        action="store_true",
+        help="keep serving the last page past the last page",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="log every request",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    server = ReplayServer(
+        (args.host, args.port),
+        recording=args.recording,
+        strict=args.strict,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        captcha_rate=args.captcha_rate,
+        pages=args.pages,
+        results=args.results,
+        names=args.names,
+        emails=args.emails,
+        pattern=args.pattern,
+        seed=args.seed,
+        repeat_last=args.repeat_last,
+        verbose=args.verbose,
+    )
+
+    print(f"Serving on {server.url} ({len(server.recording)} recorded responses)")
+    try:
+        server.serve_forever()
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        server.server_close()
+        print(json.dumps(dict(server.stats), indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Benchmark the transform subsystem.
+
+Each corpus size runs in a fresh process so the peak RSS reported for
+a size is not inflated by a previous, larger run.
+
+    python -m benchmarks.transform --sizes 10000,1000000 --output bench.json
+    python -m benchmarks.transform --compare bench.json
+    python -m benchmarks.transform --backend numpy --compare bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any,
+    Dict,
+    List,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from bridgekeeper import __version__
+from bridgekeeper.core.transform import (
+    compile_templates,
+    transform,
+    transform_batch,
+)
+from bridgekeeper.core.transform.collision import CollisionIndex
+from bridgekeeper.core.transform.transformer import Transformer
+
+from benchmarks.corpus import generate_names
+
+
+DEFAULT_SIZES = "10000,1000000,10000000"
+DEFAULT_TEMPLATES = [
+    "{f}{last}",
+    "{first}.{last}",
+    "{first}{l}",
+    "{f}{m}{last}",
+    "{f}{last}[6]",
+    "{first}_{last}@example.com",
+]
+
+# Cap on the names pushed through the per-call Transformer.transform API,
+# which is only meant to show its per-call overhead
+TRANSFORMER_CALLS = 100000
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB"""
+    if resource is None:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports KB, macOS reports bytes
+    if sys.platform == "darwin":
+        return rss / (1024 * 1024)
+
+    return rss / 1024
+
+
+def run_size(
+    size: int,
+    templates: List[str],
+    seed: int,
+    workers: int,
+    backend: str = "python",
+) -> Dict[str, Any]:
+    """Benchmark a single corpus size.
+
+    Arguments:
+        size: number of names
+        templates: username format templates
+        seed: corpus random seed
+        workers: number of processes for the transform
+        backend: transform backend (python or numpy)
+
+    Returns:
+        benchmark results
+    """
+    names = list(generate_names(size, seed=seed))
+    corpus_rss = peak_rss_mb()
+
+    # Per template cost - a single template per batch
+    per_template = {}
+    for (template, compiled) in compile_templates(",".join(templates)).items():
+        start = time.perf_counter()
+        transform_batch({template: compiled}, names)
+        elapsed = time.perf_counter() - start
+
+        per_template[template] = {
+            "elapsed": round(elapsed, 4),
+            "names_per_sec": round(size / elapsed) if elapsed else None,
+        }
+
+    # Per call API
+    calls = names[:TRANSFORMER_CALLS]
+    transformer = Transformer()
+    index = CollisionIndex()
+    start = time.perf_counter()
+    for name in calls:
+        transformer.transform(name, templates[0], index)
+    transformer_elapsed = time.perf_counter() - start
+
+    # All templates in a single transform
+    start = time.perf_counter()
+    usernames = transform(
+        ",".join(templates),
+        names,
+        workers=workers,
+        backend=backend,
+    )
+    elapsed = time.perf_counter() - start
+
+    return {
+        "size": size,
+        "elapsed": round(elapsed, 4),
+        "names_per_sec": round(size / elapsed) if elapsed else None,
+        "usernames": sum(len(u) for u in usernames.values()),
+        "corpus_rss_mb": corpus_rss,
+        "peak_rss_mb": peak_rss_mb(),
+        "transformer_calls_per_sec": (
+            round(len(calls) / transformer_elapsed) if transformer_elapsed else None
+        ),
+        "templates": per_template,
+    }
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]):
+    """Print the throughput change between two benchmark runs.
+
+    Arguments:
+        previous: previous benchmark results
+        current: current benchmark results
+    """
+    old = {r["size"]: r for r in previous["results"]}
+
+    for result in current["results"]:
+        if result["size"] not in old:
+            continue
+
+        before = old[result["size"]]
+        for key in ["names_per_sec", "peak_rss_mb"]:
+            if not before.get(key) or result.get(key) is None:
+                continue
+
+            change = ((result[key] - before[key]) / before[key]) * 100.0
+            print(
+                f"{result['size']:>10} {key:<14} "
+                f"{before[key]:>14.1f} -> {result[key]:>14.1f} ({change:+.1f}%)"
+            )
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments
+
+    Returns:
+        argument namespace
+    """
+    parser = argparse.ArgumentParser(description="BridgeKeeper transform benchmark")
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        help=f"corpus sizes (comma delimited) (Default: {DEFAULT_SIZES})",
+        default=DEFAULT_SIZES,
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        help="username format(s) (comma delimited) (Default: 6 common formats)",
+        default=",".join(DEFAULT_TEMPLATES),
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="corpus random seed (Default: 0)",
+        default=0,
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="number of processes to transform names with (Default: 1)",
+        default=1,
+    )
+    parser.add_argument(
+        "--backend",
+        type=str.lower,
+        choices=["python", "numpy"],
+        help="transform backend (Default: python)",
+        default="python",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="file to write JSON results to",
+    )
+    parser.add_argument(
+        "--compare",
+        type=str,
+        help="JSON results of a previous run to compare against",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    templates = [f.strip() for f in args.format.split(",")]
+
+    results = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "workers": args.workers,
+        "backend": args.backend,
+        "templates": templates,
+        "results": [],
+    }
+
+    # Run every size in a fresh process to isolate peak RSS
+    context = multiprocessing.get_context("spawn")
+    for size in sizes:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(
+                run_size, size, templates, args.seed, args.workers, args.backend
+            ).result()
+
+        results["results"].append(result)
+        print(
+            f"{size:>10} names: {result['names_per_sec']:>10} names/sec, "
+            f"{result['usernames']:>10} usernames, "
+            f"peak RSS {result['peak_rss_mb']} MB"
+        )
+        for (template, cost) in result["templates"].items():
+            print(f"{'':>10} {template:<30} {cost['elapsed']:>10.4f}s")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(json.load(f), results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,67 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import asyncio
+import json
 import logging
 import time
 import sys
 from pathlib import Path
+from typing import (
+    Dict,
+    List,
+    Set,
+    Tuple,
+)
 
 from bridgekeeper import (
     __banner__,
     __version__,
 )
 from bridgekeeper.core.hunt import hunt
-from bridgekeeper.core.scrape import scrape
-from bridgekeeper.core.transform import transform
-from bridgekeeper.utils.defaults import START_SCRIPT
+from bridgekeeper.core.infer import infer
+from bridgekeeper.core.output import (
+    StreamWriter,
+    UsernameWriter,
+    write,
+)
+from bridgekeeper.core.rank import rank
+from bridgekeeper.core.scrape import (
+    ResponseCache,
+    scrape,
+    scrape_companies,
+    set_rate_limits,
+)
+from bridgekeeper.core.transform import (
+    WordlistGenerator,
+    columnar_available,
+    compile_templates,
+    iter_usernames,
+    transform,
+    transform_external,
+)
+from bridgekeeper.utils.defaults import (
+    RATE_LIMIT,
+    RATE_LIMIT_JITTER,
+    SEARCH_ENGINES,
+    START_SCRIPT,
+)
 from bridgekeeper.utils.helper import (
     check_file,
     cookie_file_to_dict,
     cookie_str_to_dict,
     file_to_list,
+    timed,
+)
+from bridgekeeper.utils.egress import (
+    EGRESS_CHECK_URL,
+    EgressPool,
 )
 from bridgekeeper.utils.logger import init_logger
+from bridgekeeper.utils.record import (
+    Recorder,
+    rewrite_url,
+)
 
 
 def parse_args() -> argparse.Namespace:
@@ -41,6 +82,14 @@ def parse_args() -> argparse.Namespace:
         type=str,
         help="target company to search for LinkedIn profiles (e.g. 'Example Ltd.')",
     )
+    target_group.add_argument(
+        "--companies",
+        type=str,
+        help=(
+            "string (comma delimited) or file containing target companies to "
+            "search for LinkedIn profiles concurrently"
+        ),
+    )
     target_group.add_argument(
         "-n",
         "--names",
@@ -70,6 +119,15 @@ def parse_args() -> argparse.Namespace:
         type=str,
         help="hunter.io API key for email format identification and email scraping",
     )
+    format_group.add_argument(
+        "-e",
+        "--emails",
+        type=str,
+        help=(
+            "string (comma delimited) or file containing known email addresses "
+            "to infer the username format from (offline)"
+        ),
+    )
     format_args.add_argument(
         "-d",
         "--domain",
@@ -89,6 +147,30 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="force usernames to all upper case",
     )
+    format_args.add_argument(
+        "--workers",
+        type=int,
+        help="number of processes to transform names with (Default: 1)",
+        default=1,
+    )
+    format_args.add_argument(
+        "--backend",
+        type=str.lower,
+        choices=["python", "numpy"],
+        help=(
+            "transform backend, numpy applies templates to whole columns of "
+            "names at once (Default: python)"
+        ),
+        default="python",
+    )
+    format_args.add_argument(
+        "--max-memory",
+        type=int,
+        help=(
+            "memory ceiling in MB for deduplicating usernames, spilling sorted "
+            "runs to disk beyond it (output files are written sorted)"
+        ),
+    )
 
     search_args = parser.add_argument_group(title="Search Engine Configuration")
     search_args.add_argument(
@@ -117,6 +199,126 @@ def parse_args() -> argparse.Namespace:
         type=str,
         help="string or cookie file for Yahoo search engine",
     )
+    search_args.add_argument(
+        "--rate-limit",
+        type=str,
+        action="append",
+        metavar="ENGINE=RATE",
+        help=(
+            "requests per second to a search engine, shared by every scrape "
+            f"(Default: {RATE_LIMIT} per engine)"
+        ),
+    )
+    search_args.add_argument(
+        "--rate-jitter",
+        type=float,
+        help=(
+            "maximum random delay in seconds added to each search engine "
+            f"request (Default: {RATE_LIMIT_JITTER})"
+        ),
+        default=RATE_LIMIT_JITTER,
+    )
+    search_args.add_argument(
+        "--merge-names",
+        action="store_true",
+        help="merge near-duplicate names found across search engines",
+    )
+    search_args.add_argument(
+        "--merge-distance",
+        type=int,
+        help="maximum edit distance between merged names (Default: 1)",
+        default=1,
+    )
+    search_args.add_argument(
+        "--parse-workers",
+        type=int,
+        help=(
+            "number of processes to parse search result pages with, 0 parses "
+            "pages alongside the requests (Default: 0)"
+        ),
+        default=0,
+    )
+    search_args.add_argument(
+        "--prefetch",
+        type=int,
+        help=(
+            "maximum number of page requests in flight at once per search "
+            "engine, within its rate limit (DuckDuckGo pages are always "
+            "requested one at a time) (Default: 1)"
+        ),
+        default=1,
+    )
+    search_args.add_argument(
+        "--min-novelty",
+        type=float,
+        help=(
+            "minimum share of new names per page, a search engine stops early "
+            "once its pages stay below it (e.g. 0.1, pages repeating a "
+            "previous page always stop a search engine) (Default: 0, off)"
+        ),
+        default=0.0,
+    )
+    search_args.add_argument(
+        "--novelty-patience",
+        type=int,
+        help=(
+            "number of consecutive pages below --min-novelty before a search "
+            "engine stops early (Default: 2)"
+        ),
+        default=2,
+    )
+    search_args.add_argument(
+        "--max-requests",
+        type=int,
+        help=(
+            "maximum number of requests per company across all search "
+            "engines, the tail of the budget goes to the search engines "
+            "bringing the most new names per request"
+        ),
+    )
+    search_args.add_argument(
+        "--max-time",
+        type=float,
+        help=(
+            "maximum number of seconds per company to keep sending search "
+            "engine requests"
+        ),
+    )
+    search_args.add_argument(
+        "--fan-out",
+        type=int,
+        help=(
+            "maximum number of sub-queries to scrape each search engine with, "
+            "the company followed by its aliases, then narrowed down to "
+            "--titles, --locations and common job titles (Default: 1)"
+        ),
+        default=1,
+    )
+    search_args.add_argument(
+        "--aliases",
+        type=str,
+        help=(
+            "string (comma delimited) or file containing other names of the "
+            "target company to search for (the name without its legal suffix "
+            "is always included)"
+        ),
+    )
+    search_args.add_argument(
+        "--titles",
+        type=str,
+        help=(
+            "string (comma delimited) or file containing job titles to narrow "
+            "sub-queries down to"
+        ),
+    )
+    search_args.add_argument(
+        "--locations",
+        type=str,
+        help=(
+            "string (comma delimited) or file containing locations to narrow "
+            "sub-queries down to"
+        ),
+    )
 
     http_args = parser.add_argument_group(title="HTTP Configuration")
     http_args.add_argument(
@@ -130,6 +332,57 @@ def parse_args() -> argparse.Namespace:
         type=str,
         help="proxy to pass HTTP traffic through: `host:port`",
     )
+    http_args.add_argument(
+        "--proxy-file",
+        type=str,
+        help=(
+            "file containing proxies (`host:port` or url per line) to spread "
+            "HTTP traffic over, checked before use and failed over when they "
+            "time out or refuse connections"
+        ),
+    )
+    http_args.add_argument(
+        "--proxy-concurrency",
+        type=int,
+        help="maximum number of requests in flight per proxy (Default: 4)",
+        default=4,
+    )
+    http_args.add_argument(
+        "--proxy-state",
+        type=str,
+        help=(
+            "file to keep the health of each proxy in between runs "
+            "(Default: <proxy file>.health.json)"
+        ),
+    )
+    http_args.add_argument(
+        "--cache",
+        type=str,
+        help="directory to cache search engine responses in",
+    )
+    http_args.add_argument(
+        "--cache-ttl",
+        type=float,
+        help="seconds a cached search engine response stays fresh (Default: 86400)",
+        default=86400,
+    )
+    http_args.add_argument(
+        "--cache-size",
+        type=int,
+        help="maximum size of the response cache in MB (Default: 256)",
+        default=256,
+    )
+    http_args.add_argument(
+        "--offline",
+        action="store_true",
+        help="only serve search engine responses from the cache, sending no requests",
+    )
+    # Send every request to a stand-in server (benchmarks/replay_server.py)
+    http_args.add_argument(
+        "--endpoint",
+        type=str,
+        help=argparse.SUPPRESS,
+    )
 
     output_args = parser.add_argument_group(title="Output Configuration")
     output_args.add_argument(
@@ -139,6 +392,93 @@ def parse_args() -> argparse.Namespace:
         help="directory to write output files to (Default: output)",
         default="output",
     )
+    output_args.add_argument(
+        "--stream",
+        type=str,
+        choices=StreamWriter.FORMATS,
+        help=(
+            "stream usernames as they are generated instead of writing a file "
+            "per username format (plain: one username per line, ndjson: "
+            "{template, name, username} objects)"
+        ),
+    )
+    output_args.add_argument(
+        "--stream-output",
+        type=str,
+        help="file to stream usernames to (Default: stdout)",
+        default="-",
+    )
+    output_args.add_argument(
+        "--shards",
+        type=int,
+        help=(
+            "number of evenly sized files to split each username format into "
+            "(Default: 1)"
+        ),
+        default=1,
+    )
+    output_args.add_argument(
+        "--compress",
+        type=str,
+        choices=[c for c in UsernameWriter.COMPRESSION.keys() if c],
+        help="compress username files",
+    )
+    output_args.add_argument(
+        "--rank",
+        action="store_true",
+        help=(
+            "write every username to a single file, ordered from most to "
+            "least likely"
+        ),
+    )
+    output_args.add_argument(
+        "--top",
+        type=int,
+        help="only write the TOP most likely usernames to the ranked file",
+    )
+
+    wordlist_args = parser.add_argument_group(title="Wordlist Generation")
+    wordlist_args.add_argument(
+        "--wordlist",
+        type=str,
+        help=(
+            "file to lazily write a single wordlist to, across every username "
+            "format, domain and trim length"
+        ),
+    )
+    wordlist_args.add_argument(
+        "--domains",
+        type=str,
+        help=(
+            "string (comma delimited) or file containing email domains to "
+            "append to each username format without a domain"
+        ),
+    )
+    wordlist_args.add_argument(
+        "--trims",
+        type=str,
+        help=(
+            "trim lengths (comma delimited) to apply to the last full name "
+            "formatter of each username format (e.g. '4,6,8')"
+        ),
+    )
+    wordlist_args.add_argument(
+        "--offset",
+        type=int,
+        help="number of usernames to skip when resuming a wordlist (Default: 0)",
+        default=0,
+    )
+    wordlist_args.add_argument(
+        "--limit",
+        type=int,
+        help="maximum number of usernames to write to the wordlist",
+    )
+    wordlist_args.add_argument(
+        "--chunk-size",
+        type=int,
+        help="number of usernames per wordlist write (Default: 100000)",
+        default=100000,
+    )
 
     debug_args = parser.add_argument_group(title="Debug")
     debug_args.add_argument(
@@ -151,6 +491,19 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="enable debug output",
     )
+    debug_args.add_argument(
+        "--record",
+        type=str,
+        help=(
+            "file to append every search engine and Hunter.io request/response "
+            "pair to (NDJSON), for replay via benchmarks/replay_server.py"
+        ),
+    )
+    debug_args.add_argument(
+        "--stats",
+        type=str,
+        help="file to write the wall-clock time of each stage to (JSON)",
+    )
 
     args = parser.parse_args()
 
@@ -159,11 +512,121 @@ def parse_args() -> argparse.Namespace:
         sys.exit(print(f"BridgeKeeper - v{__version__}"))
 
     # Handle required argument conditions
-    if not args.company and not args.names:
-        parser.error("one of the arguments -c/--company -F/--file is required")
+    if not args.company and not args.names and not args.companies:
+        parser.error("one of the arguments -c/--company --companies -n/--names is required")  # fmt: skip
+
+    if args.companies and not args.format:
+        parser.error("argument --companies requires argument -f/--format")
+
+    if args.companies and (args.stream or args.wordlist):
+        parser.error("argument --companies not allowed with arguments --stream or --wordlist")  # fmt: skip
+
+    if not args.format and not args.api and not args.emails:
+        parser.error("one of the arguments -f/--format -a/--api -e/--emails is required")  # fmt: skip
+
+    if args.wordlist and args.stream:
+        parser.error("argument --wordlist not allowed with argument --stream")
+
+    if args.top is not None:
+        if args.top < 1:
+            parser.error("argument --top must be at least 1")
+
+        args.rank = True
+
+    if args.rank and (args.stream or args.wordlist):
+        parser.error("argument --rank/--top not allowed with arguments --stream or --wordlist")  # fmt: skip
+
+    if args.trims:
+        try:
+            args.trims = [int(t) for t in args.trims.split(",") if t.strip()]
+
+        except ValueError:
+            parser.error("argument --trims must be a comma delimited list of integers")  # fmt: skip
+
+    if args.workers < 1:
+        parser.error("argument --workers must be at least 1")
+
+    if args.backend == "numpy" and not columnar_available():
+        parser.error("argument --backend numpy requires numpy to be installed")
+
+    if args.shards < 1:
+        parser.error("argument --shards must be at least 1")
+
+    if args.rate_limit:
+        rate_limits = {}
+        for rate_limit in args.rate_limit:
+            (engine, _, rate) = rate_limit.partition("=")
+            engine = engine.strip().lower()
+            if engine not in SEARCH_ENGINES:
+                parser.error(f"argument --rate-limit: invalid search engine: '{engine}'")  # fmt: skip
+
+            try:
+                rate_limits[engine] = float(rate)
+
+            except ValueError:
+                parser.error(f"argument --rate-limit: invalid rate: '{rate}'")
 
-    if not args.format and not args.api:
-        parser.error("one of the arguments -f/--format -a/--api is required")
+            if rate_limits[engine] <= 0:
+                parser.error("argument --rate-limit must be greater than 0")
+
+        args.rate_limit = rate_limits
+
+    if args.rate_jitter < 0:
+        parser.error("argument --rate-jitter must be at least 0")
+
+    if args.offline and not args.cache:
+        parser.error("argument --offline requires argument --cache")
+
+    if args.cache_ttl < 0:
+        parser.error("argument --cache-ttl must be at least 0")
+
+    if args.cache_size < 1:
+        parser.error("argument --cache-size must be at least 1")
+
+    if args.endpoint and "://" not in args.endpoint:
+        parser.error("argument --endpoint must be a url (e.g. http://127.0.0.1:8080)")  # fmt: skip
+
+    if args.merge_distance < 0:
+        parser.error("argument --merge-distance must be at least 0")
+
+    if args.parse_workers < 0:
+        parser.error("argument --parse-workers must be at least 0")
+
+    if args.prefetch < 1:
+        parser.error("argument --prefetch must be at least 1")
+
+    if not 0 <= args.min_novelty <= 1:
+        parser.error("argument --min-novelty must be between 0 and 1")
+
+    if args.novelty_patience < 1:
+        parser.error("argument --novelty-patience must be at least 1")
+
+    if args.max_requests is not None and args.max_requests < 1:
+        parser.error("argument --max-requests must be at least 1")
+
+    if args.max_time is not None and args.max_time <= 0:
+        parser.error("argument --max-time must be greater than 0")
+
+    if args.fan_out < 1:
+        parser.error("argument --fan-out must be at least 1")
+
+    if args.proxy and args.proxy_file:
+        parser.error("argument --proxy cannot be used with --proxy-file")
+
+    if args.proxy_file and not check_file(args.proxy_file):
+        parser.error(f"argument --proxy-file: file not found: {args.proxy_file}")
+
+    if args.proxy_state and not args.proxy_file:
+        parser.error("argument --proxy-state requires argument --proxy-file")
+
+    if args.proxy_concurrency < 1:
+        parser.error("argument --proxy-concurrency must be at least 1")
+
+    if args.aliases and args.companies:
+        parser.error("argument --aliases cannot be used with --companies")
+
+    if args.max_memory is not None and args.max_memory < 1:
+        parser.error("argument --max-memory must be at least 1")
 
     # If API is set, require a domain name
     if args.api and not args.domain:
@@ -190,6 +653,63 @@ def update_args(args: argparse.Namespace) -> argparse.Namespace:
             logging.debug(f"Names file not found, assuming comma delimited list")
             args.names = args.names.split(",")
 
+    if args.companies:
+        if check_file(args.companies):
+            logging.debug(f"Loading companies from: {args.companies}")
+            args.companies = file_to_list(args.companies)
+
+        else:
+            logging.debug(f"Companies file not found, assuming comma delimited list")  # fmt: skip
+            args.companies = [c.strip() for c in args.companies.split(",") if c.strip()]  # fmt: skip
+
+        # Drop duplicate targets, keeping the order given
+        args.companies = list(dict.fromkeys(args.companies))
+
+    if args.emails:
+        if check_file(args.emails):
+            logging.debug(f"Loading emails from: {args.emails}")
+            args.emails = file_to_list(args.emails)
+
+        else:
+            logging.debug(f"Emails file not found, assuming comma delimited list")
+            args.emails = [e.strip() for e in args.emails.split(",") if e.strip()]
+
+    if args.aliases:
+        if check_file(args.aliases):
+            logging.debug(f"Loading aliases from: {args.aliases}")
+            args.aliases = file_to_list(args.aliases)
+
+        else:
+            logging.debug(f"Aliases file not found, assuming comma delimited list")
+            args.aliases = [a.strip() for a in args.aliases.split(",") if a.strip()]
+
+    if args.titles:
+        if check_file(args.titles):
+            logging.debug(f"Loading titles from: {args.titles}")
+            args.titles = file_to_list(args.titles)
+
+        else:
+            logging.debug(f"Titles file not found, assuming comma delimited list")
+            args.titles = [t.strip() for t in args.titles.split(",") if t.strip()]
+
+    if args.locations:
+        if check_file(args.locations):
+            logging.debug(f"Loading locations from: {args.locations}")
+            args.locations = file_to_list(args.locations)
+
+        else:
+            logging.debug(f"Locations file not found, assuming comma delimited list")
+            args.locations = [l.strip() for l in args.locations.split(",") if l.strip()]
+
+    if args.domains:
+        if check_file(args.domains):
+            logging.debug(f"Loading domains from: {args.domains}")
+            args.domains = file_to_list(args.domains)
+
+        else:
+            logging.debug(f"Domains file not found, assuming comma delimited list")
+            args.domains = [d.strip() for d in args.domains.split(",") if d.strip()]
+
     # Disabled - still parse, in case we need it in the future, but
     # remove output
     if args.bing_cookies:
@@ -231,17 +751,457 @@ def update_args(args: argparse.Namespace) -> argparse.Namespace:
     return args
 
 
+def infer_username_format(
+    names: List[str],
+    emails: List[str],
+    domain: str = None,
+) -> Tuple[str, float]:
+    """Infer the username format from known email addresses and exit if
+    no candidate format matches.
+
+    Arguments:
+        names: employee names
+        emails: known email addresses
+        domain: domain name of the target company
+
+    Returns:
+        (best matching username format, match rate)
+    """
+    logging.info(f"Inferring username format from {len(emails)} known emails")
+
+    ranked = infer(names, emails, domain=domain)
+    if not ranked:
+        logging.error("No username format found")
+        sys.exit(0)
+
+    for (format_, matches, rate) in ranked[:5]:
+        logging.info(f"Candidate username format: {format_} ({matches} emails, {rate:.0%})")  # fmt: skip
+
+    return (ranked[0][0], ranked[0][2])
+
+
+def username_file(args: argparse.Namespace, output_dir: str, template: str) -> str:
+    """Build the output file name for a username format template.
+
+    Arguments:
+        args: argument namespace
+        output_dir: directory to write output files to
+        template: username format template
+
+    Returns:
+        output file path
+    """
+    company_fname = ""
+    if args.company:
+        company_fname = args.company.replace(".", "_").replace(" ", "-") + "_"
+
+    template_fname = template.replace("{", "").replace("}", "")
+    return f"{output_dir}/{company_fname}{template_fname}_{START_SCRIPT}.txt"
+
+
+def stream_usernames(
+    args: argparse.Namespace,
+    username_format: str,
+    names: List[str],
+    hunterio_emails: Set[str],
+):
+    """Transform names and stream usernames as they are generated, only
+    keeping the state needed for duplicate numbering.
+
+    Arguments:
+        args: argument namespace
+        username_format: username format(s) (comma delimited)
+        names: names to transform
+        hunterio_emails: emails found via Hunter.io
+    """
+    if args.workers > 1:
+        logging.warning("Streaming transforms names serially, ignoring --workers")
+
+    if args.backend != "python":
+        logging.warning("Streaming transforms names one at a time, ignoring --backend")  # fmt: skip
+
+    templates = compile_templates(username_format)
+    indexes = {}
+
+    with StreamWriter(args.stream_output, args.stream) as writer:
+        writer.write_all(iter_usernames(templates, names, indexes))
+
+        # If we used Hunter.io, add uniquely scraped emails since they
+        # should already be in the correct username/email format
+        if args.api and args.domain and username_format in indexes:
+            for email in hunterio_emails:
+                if email not in indexes[username_format]:
+                    indexes[username_format].usernames.add(email)
+                    writer.write(username_format, None, email)
+
+    logging.info(f"Number of unique usernames found: {writer.count}")
+
+
+def write_wordlist(
+    args: argparse.Namespace,
+    username_format: str,
+    names: List[str],
+):
+    """Lazily generate a single wordlist across every username format
+    template, email domain and trim length.
+
+    Arguments:
+        args: argument namespace
+        username_format: username format(s) (comma delimited)
+        names: names to transform
+    """
+    if args.backend != "python":
+        logging.warning("Wordlists are generated one name at a time, ignoring --backend")  # fmt: skip
+
+    generator = WordlistGenerator(
+        templates=[f.strip() for f in username_format.split(",")],
+        names=names,
+        domains=args.domains,
+        trims=args.trims,
+    )
+
+    # Report the exact output size before generating anything
+    size = len(generator)
+    end = size if args.limit is None else min(size, args.offset + args.limit)
+    logging.info(f"Wordlist size: {size} usernames")
+    logging.info(f"Writing usernames {min(args.offset, end)}-{end} to: {args.wordlist}")
+
+    try:
+        count = generator.write(
+            args.wordlist,
+            offset=args.offset,
+            limit=args.limit,
+            chunk_size=args.chunk_size,
+        )
+
+    except ValueError as e:
+        logging.error(f"{e}")
+        sys.exit(1)
+
+    logging.info(f"Number of usernames written: {count}")
+
+
+def write_usernames(
+    args: argparse.Namespace,
+    output_dir: str,
+    username_format: str,
+    names: List[str],
+    hunterio_emails: Set[str],
+):
+    """Transform names and write usernames to a file per username
+    format template.
+
+    Arguments:
+        args: argument namespace
+        output_dir: directory to write output files to
+        username_format: username format(s) (comma delimited)
+        names: names to transform
+        hunterio_emails: emails found via Hunter.io
+    """
+    # Transform found names to email addresses
+    # Return a mapping of username format template -> formatted usernames
+    if args.backend == "numpy" and args.workers > 1:
+        logging.warning("The numpy backend transforms names in a single process, ignoring --workers")  # fmt: skip
+
+    formatted_usernames = transform(
+        username_format,
+        names,
+        workers=args.workers,
+        backend=args.backend,
+    )
+
+    # If we used Hunter.io, add uniquely scraped emails since they should
+    # already be in the correct username/email format
+    if args.api and args.domain:
+        formatted_usernames[username_format] = formatted_usernames[username_format] | set(hunterio_emails)  # fmt: skip
+
+    unique_usernames = sum(len(formatted_usernames[t]) for t in formatted_usernames)
+    logging.info(f"Number of unique usernames found: {unique_usernames}")
+
+    # Write converted usernames to output directory
+    if any(len(formatted_usernames[t]) > 0 for t in formatted_usernames.keys()):
+        logging.info(f"Writing usernames to the following directory: {output_dir}")
+
+        write(
+            formatted_usernames,
+            {t: username_file(args, output_dir, t) for t in formatted_usernames},
+            shards=args.shards,
+            compression=args.compress,
+        )
+
+
+def write_sorted_usernames(
+    args: argparse.Namespace,
+    output_dir: str,
+    username_format: str,
+    names: List[str],
+    hunterio_emails: Set[str],
+):
+    """Transform names and write sorted usernames to a file per username
+    format template, spilling to disk beyond the memory ceiling.
+
+    Arguments:
+        args: argument namespace
+        output_dir: directory to write output files to
+        username_format: username format(s) (comma delimited)
+        names: names to transform
+        hunterio_emails: emails found via Hunter.io
+    """
+    if args.workers > 1:
+        logging.warning("Spilling to disk transforms names serially, ignoring --workers")  # fmt: skip
+
+    if args.backend != "python":
+        logging.warning("Spilling to disk transforms names one at a time, ignoring --backend")  # fmt: skip
+
+    templates = compile_templates(username_format)
+    sorters = transform_external(templates, names, args.max_memory * 1024 * 1024)
+
+    # If we used Hunter.io, add scraped emails since they should already
+    # be in the correct username/email format, they are deduplicated when
+    # the sorted runs are merged
+    if args.api and args.domain and username_format in sorters:
+        for email in hunterio_emails:
+            sorters[username_format].add(email)
+
+    logging.info(f"Writing usernames to the following directory: {output_dir}")
+
+    try:
+        counts = write(
+            {t: sorter.sorted(unique=True) for (t, sorter) in sorters.items()},
+            {t: username_file(args, output_dir, t) for t in sorters},
+            shards=args.shards,
+            compression=args.compress,
+        )
+
+    finally:
+        for sorter in sorters.values():
+            sorter.close()
+
+    unique_usernames = sum(counts.values())
+    logging.info(f"Number of unique usernames found: {unique_usernames}")
+
+
+def write_ranked_usernames(
+    args: argparse.Namespace,
+    output_dir: str,
+    username_format: str,
+    names: List[str],
+    hunterio_emails: Set[str],
+    scores: Dict[str, float],
+    sightings: Dict[str, int],
+):
+    """Write usernames of every username format template to a single
+    file, ordered from most to least likely.
+
+    Arguments:
+        args: argument namespace
+        output_dir: directory to write output files to
+        username_format: username format(s) (comma delimited)
+        names: names to transform
+        hunterio_emails: emails found via Hunter.io
+        scores: dictionary of username templates -> confidence score
+        sightings: dictionary of names -> number of search engines that
+          found them
+    """
+    ranked = rank(
+        username_format,
+        names,
+        scores=scores,
+        sightings=sightings,
+        known=sorted(hunterio_emails),
+        top=args.top,
+    )
+
+    company_fname = ""
+    if args.company:
+        company_fname = args.company.replace(".", "_").replace(" ", "-") + "_"
+
+    output_file = f"{output_dir}/{company_fname}ranked_{START_SCRIPT}.txt"
+    logging.info(f"Writing ranked usernames to the following file: {output_file}")
+
+    writer = UsernameWriter(output_file, compression=args.compress)
+    count = writer.write(ranked)
+
+    logging.info(f"Number of ranked usernames: {count}")
+
+
+def transform_names(
+    args: argparse.Namespace,
+    output_dir: str,
+    username_format: str,
+    names: List[str],
+    hunterio_emails: Set[str],
+    scores: Dict[str, float],
+    sightings: Dict[str, int],
+):
+    """Transform names to usernames and write them out in the requested
+    output mode.
+
+    Arguments:
+        args: argument namespace
+        output_dir: directory to write output files to
+        username_format: username format(s) (comma delimited)
+        names: names to transform
+        hunterio_emails: emails found via Hunter.io
+        scores: dictionary of username templates -> confidence score
+        sightings: dictionary of names -> number of search engines that
+          found them
+    """
+    # Convert names to upper/lower, if specified
+    if args.upper or args.lower:
+        names = (
+            [name.lower() for name in names]
+            if args.lower
+            else [name.upper() for name in names]
+        )
+        sightings = {
+            (name.lower() if args.lower else name.upper()): count
+            for (name, count) in sightings.items()
+        }
+
+    # Stream usernames as they are generated, generate a single wordlist
+    # or write usernames to a file per username format template
+    if args.stream:
+        stream_usernames(args, username_format, names, hunterio_emails)
+
+    elif args.wordlist:
+        write_wordlist(args, username_format, names)
+
+    elif args.max_memory:
+        write_sorted_usernames(args, output_dir, username_format, names, hunterio_emails)  # fmt: skip
+
+    else:
+        write_usernames(args, output_dir, username_format, names, hunterio_emails)
+
+    # Write every username to a single file, most likely candidates first
+    if args.rank:
+        write_ranked_usernames(args, output_dir, username_format, names, hunterio_emails, scores, sightings)  # fmt: skip
+
+
+def scrape_batch(
+    args: argparse.Namespace,
+    output_dir: str,
+    cache: ResponseCache = None,
+    recorder: Recorder = None,
+    egress: EgressPool = None,
+):
+    """Scrape every target company concurrently, writing the names and
+    usernames of each company as soon as it is done.
+
+    Arguments:
+        args: argument namespace
+        output_dir: directory to write output files to
+        cache: on-disk cache of search engine responses
+        recorder: recording of request/response pairs
+        egress: pool of proxies to spread requests over
+    """
+    # Create file to write the names of all companies to
+    combined_file = f"{output_dir}/companies_names_{START_SCRIPT}.txt"
+
+    seen = set()
+
+    def write(company: str, names: Dict[str, int]):
+        with open(combined_file, "a") as f:
+            for name in names.keys():
+                if name not in seen:
+                    seen.add(name)
+                    f.write(f"{name}\n")
+
+        # Name the output files of each company after it
+        company_args = argparse.Namespace(**vars(args))
+        company_args.company = company
+
+        transform_names(company_args, output_dir, args.format, list(names.keys()), set(), {}, names)  # fmt: skip
+
+    async def run():
+        loop = asyncio.get_running_loop()
+
+        done = 0
+        async for (company, names) in scrape_companies(
+            args.companies,
+            output_dir,
+            depth=args.depth,
+            timeout=args.timeout,
+            proxy=args.proxy,
+            bing_cookies=args.bing_cookies,
+            duckduckgo_cookies=args.duckduckgo_cookies,
+            google_cookies=args.google_cookies,
+            yahoo_cookies=args.yahoo_cookies,
+            merge_distance=args.merge_distance if args.merge_names else None,
+            cache=cache,
+            recorder=recorder,
+            endpoint=args.endpoint,
+            parse_workers=args.parse_workers,
+            prefetch=args.prefetch,
+            min_novelty=args.min_novelty,
+            novelty_patience=args.novelty_patience,
+            max_requests=args.max_requests,
+            max_time=args.max_time,
+            fan_out=args.fan_out,
+            aliases=args.aliases,
+            titles=args.titles,
+            locations=args.locations,
+            egress=egress,
+        ):
+            done += 1
+            logging.info(f"Names found for {company}: {len(names)} ({done}/{len(args.companies)})")  # fmt: skip
+
+            if not names:
+                continue
+
+            # Transform and write off the event loop so the companies
+            # still being scraped keep sending requests meanwhile
+            await loop.run_in_executor(None, write, company, names)
+
+        logging.info(f"Names found via search engine(s) across companies: {len(seen)}")  # fmt: skip
+        return len(seen)
+
+    return asyncio.run(run())
+
+
+def write_stats(
+    stats_file: str,
+    stages: Dict[str, float],
+    elapsed: float,
+    names: int,
+    recorder: Recorder = None,
+):
+    """Write the wall-clock time of each stage of a run.
+
+    Arguments:
+        stats_file: file to write the stats to (JSON)
+        stages: dictionary of stage -> seconds
+        elapsed: total execution time in seconds
+        names: number of names transformed
+        recorder: recording of request/response pairs
+    """
+    stats = {
+        "version": __version__,
+        "elapsed": round(elapsed, 4),
+        "stages": {stage: round(t, 4) for (stage, t) in stages.items()},
+        "names": names,
+        "recorded": recorder.count if recorder else None,
+    }
+
+    logging.debug(f"Writing stats to the following file: {stats_file}")
+    with open(stats_file, "w") as f:
+        json.dump(stats, f, indent=2)
+
+
 def main():
     """Entry point of BridgeKeeper."""
 
     args = parse_args()
     init_logger(args.debug)
 
-    print(__banner__)
+    # Keep stdout clean when streaming usernames to it
+    streaming_stdout = args.stream and args.stream_output == "-"
+    print(__banner__, file=(sys.stderr if streaming_stdout else sys.stdout))
     args = update_args(args)
 
-    # Track execution time
+    # Track execution time, in total and per stage
     start = time.time()
+    stages = {}
 
     # Create the output directory if not exists
     output_dir = args.output.strip("/")
@@ -249,33 +1209,111 @@ def main():
         logging.info(f"Creating output directory: {output_dir}")
         Path(output_dir).mkdir(parents=True, exist_ok=True)
 
+    # Cache search engine responses across runs
+    cache = None
+    if args.cache:
+        cache = ResponseCache(
+            args.cache,
+            ttl=args.cache_ttl,
+            max_size=args.cache_size * 1024 * 1024,
+            offline=args.offline,
+        )
+
+    # Record every request/response pair for later replay
+    recorder = Recorder(args.record) if args.record else None
+
+    # Spread requests over a pool of proxies, never falling back to a
+    # direct connection
+    egress = None
+    if args.proxy_file:
+        egress = EgressPool(
+            file_to_list(args.proxy_file),
+            concurrency=args.proxy_concurrency,
+            state_file=args.proxy_state or f"{args.proxy_file}.health.json",
+        )
+
+        if not args.offline:
+            check_url = EGRESS_CHECK_URL
+            if args.endpoint:
+                check_url = rewrite_url(check_url, args.endpoint)
+
+            asyncio.run(egress.check(check_url, timeout=args.timeout))
+
+            # Offline runs send no requests, so need no healthy proxy
+            if not egress.healthy:
+                logging.error("No healthy proxies to send requests through")
+                sys.exit(1)
+
+    # Scrape and transform names of many companies at once
+    if args.companies:
+        logging.info(f"Scraping search engines for user names of {len(args.companies)} companies")  # fmt: skip
+
+        set_rate_limits(args.rate_limit, args.rate_jitter)
+        with timed(stages, "batch"):
+            found = scrape_batch(args, output_dir, cache, recorder, egress)
+
+        if egress:
+            egress.save()
+
+        elapsed = time.time() - start
+        logging.debug(f"{__file__} executed in {elapsed:.4f} seconds.")
+
+        if args.stats:
+            write_stats(args.stats, stages, elapsed, found, recorder)
+
+        return
+
     # Handle scraping for usernames
     if args.company:
         logging.info("Scraping search engines for user names")
 
-        scraped_names = scrape(
-            company=args.company,
-            output_dir=output_dir,
-            depth=args.depth,
-            timeout=args.timeout,
-            proxy=args.proxy,
-            bing_cookies=args.bing_cookies,
-            duckduckgo_cookies=args.duckduckgo_cookies,
-            google_cookies=args.google_cookies,
-            yahoo_cookies=args.yahoo_cookies,
-        )
+        set_rate_limits(args.rate_limit, args.rate_jitter)
+
+        with timed(stages, "scrape"):
+            scraped_names = scrape(
+                company=args.company,
+                output_dir=output_dir,
+                depth=args.depth,
+                timeout=args.timeout,
+                proxy=args.proxy,
+                bing_cookies=args.bing_cookies,
+                duckduckgo_cookies=args.duckduckgo_cookies,
+                google_cookies=args.google_cookies,
+                yahoo_cookies=args.yahoo_cookies,
+                merge_distance=args.merge_distance if args.merge_names else None,
+                cache=cache,
+                recorder=recorder,
+                endpoint=args.endpoint,
+                parse_workers=args.parse_workers,
+                prefetch=args.prefetch,
+                min_novelty=args.min_novelty,
+                novelty_patience=args.novelty_patience,
+                max_requests=args.max_requests,
+                max_time=args.max_time,
+                fan_out=args.fan_out,
+                aliases=args.aliases,
+                titles=args.titles,
+                locations=args.locations,
+                egress=egress,
+            )
 
         if not scraped_names:
             logging.error("No user names were found")
+
+            if args.stats:
+                write_stats(args.stats, stages, time.time() - start, 0, recorder)
+
             sys.exit(0)
 
         logging.info(f"Names found via search engine(s): {len(scraped_names)}")
 
-        names = scraped_names
+        names = list(scraped_names.keys())
+        sightings = scraped_names
 
     # If name file provided, load names
     else:
         names = args.names
+        sightings = {}
 
         logging.info(f"Names loaded: {len(names)}")
 
@@ -283,71 +1321,60 @@ def main():
     if args.api and args.domain:
         logging.info("Hunting Hunter.io for emails and username format")
 
-        (hunterio_emails, hunterio_format) = hunt(
-            domain=args.domain,
-            api_key=args.api,
-            output_dir=output_dir,
-            timeout=args.timeout,
-            proxy=args.proxy,
-        )
+        with timed(stages, "hunt"):
+            (hunterio_emails, hunterio_format) = hunt(
+                domain=args.domain,
+                api_key=args.api,
+                output_dir=output_dir,
+                timeout=args.timeout,
+                proxy=args.proxy,
+                recorder=recorder,
+                endpoint=args.endpoint,
+                egress=egress,
+            )
 
-        if not hunterio_format:
-            logging.error("No username format found")
-            sys.exit(0)
-
-        logging.info(f"Username format found via Hunter.io: {hunterio_format}")
         logging.info(f"Emails found via Hunter.io: {len(hunterio_emails)}")
 
-        username_format = hunterio_format
+        if hunterio_format:
+            logging.info(f"Username format found via Hunter.io: {hunterio_format}")
+            username_format = hunterio_format
+            scores = {username_format: 1.0}
+
+        # Fall back to inferring the format from the emails we collected
+        else:
+            logging.warning("No username format found via Hunter.io, inferring from emails")  # fmt: skip
+            (username_format, rate) = infer_username_format(names, hunterio_emails, args.domain)  # fmt: skip
+            scores = {username_format: rate}
+
+    # If known emails provided, infer the username format offline
+    elif args.emails:
+        hunterio_emails = set()
+        with timed(stages, "infer"):
+            (username_format, rate) = infer_username_format(names, args.emails, args.domain)  # fmt: skip
+        scores = {username_format: rate}
 
     # If username format(s) provided, load format(s)
     else:
+        hunterio_emails = set()
         username_format = args.format
+        scores = {}
         logging.info(f"Username format(s): {username_format}")
 
-    logging.info("Transforming names")
+    # Keep the health of each proxy for the next run
+    if egress:
+        egress.save()
 
-    # Convert names to upper/lower, if specified
-    if args.upper or args.lower:
-        names = (
-            [name.lower() for name in names]
-            if args.lower
-            else [name.upper() for name in names]
-        )
-
-    # Transform found names to email addresses
-    # Return a mapping of username format template -> formatted usernames
-    formatted_usernames = transform(username_format, names)
-
-    # If we used Hunter.io, add uniquely scraped emails since they should
-    # already be in the correct username/email format
-    if args.api and args.domain:
-        formatted_usernames[username_format] = formatted_usernames[username_format] | set(hunterio_emails)  # fmt: skip
-
-    unique_usernames = sum(len(formatted_usernames[t]) for t in formatted_usernames)
-    logging.info(f"Number of unique usernames found: {unique_usernames}")
-
-    # Write converted usernames to output directory
-    if any(len(formatted_usernames[t]) > 0 for t in formatted_usernames.keys()):
-        logging.info(f"Writing usernames to the following directory: {output_dir}")
-
-        company_fname = ""
-        if args.company:
-            company_fname = args.company.replace(".", "_").replace(" ", "-") + "_"
-
-        # Loop over format templates
-        for template in formatted_usernames.keys():
-            template_fname = template.replace("{", "").replace("}", "")
-            template_outfile = f"{output_dir}/{company_fname}{template_fname}_{START_SCRIPT}.txt"  # fmt: skip
+    logging.info("Transforming names")
 
-            logging.debug(f"Writing '{template}' to: {template_outfile}")
-            with open(template_outfile, "w") as f:
-                for username in formatted_usernames[template]:
-                    f.write(f"{username}\n")
+    with timed(stages, "transform"):
+        transform_names(args, output_dir, username_format, names, hunterio_emails, scores, sightings)  # fmt: skip
 
     elapsed = time.time() - start
     logging.debug(f"{__file__} executed in {elapsed:.4f} seconds.")
 
+    if args.stats:
+        write_stats(args.stats, stages, elapsed, len(names), recorder)
+
 
 if __name__ == "__main__":
     main()
@@ -8,6 +8,8 @@ from typing import (
 
 from bridgekeeper.core.hunt.hunter import Hunter
 from bridgekeeper.utils.defaults import START_SCRIPT
+from bridgekeeper.utils.egress import EgressPool
+from bridgekeeper.utils.record import Recorder
 
 
 def hunt(
@@ -16,6 +18,9 @@ def hunt(
     output_dir: str,
     timeout: float = 25,
     proxy: str = None,
+    recorder: Recorder = None,
+    endpoint: str = None,
+    egress: EgressPool = None,
 ) -> Tuple[Set[str], str]:
     """Run Hunter.io to get a username format for the target domain
     as well as any available email addresses -> These should already
@@ -27,6 +32,10 @@ def hunt(
         output_dir: directory where to write emails file to
         timeout: request timeout (HTTP)
         proxy: request proxy (HTTP)
+        recorder: recording of request/response pairs
+        endpoint: base url of a stand-in server to send every request to
+          instead of Hunter.io (benchmarks/testing)
+        egress: pool of proxies to spread requests over, replacing `proxy`
 
     Returns:
         (found emails, email format)
@@ -36,6 +45,9 @@ def hunt(
         api_key=api_key,
         timeout=timeout,
         proxy=proxy,
+        recorder=recorder,
+        endpoint=endpoint,
+        egress=egress,
     )
 
     # Hunt format and emails
@@ -3,14 +3,29 @@
 
 import logging
 import requests  # type: ignore
+import time
 import urllib3  # type: ignore
 from typing import Set
 
 from bridgekeeper.utils.defaults import HTTP_HEADERS
+from bridgekeeper.utils.egress import (
+    MAX_ATTEMPTS,
+    EgressPool,
+)
+from bridgekeeper.utils.record import (
+    Recorder,
+    rewrite_url,
+)
 
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Errors of a proxy (rather than of Hunter.io) to fail over on
+EGRESS_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
 
 class Hunter(object):
     """Find username format and emails via Hunter.io."""
@@ -23,6 +38,9 @@ class Hunter(object):
         api_key: str,
         timeout: float = 25,
         proxy: str = None,
+        recorder: Recorder = None,
+        endpoint: str = None,
+        egress: EgressPool = None,
     ):
         """Initialize Hunter instance.
 
@@ -31,6 +49,11 @@ class Hunter(object):
             api_key: Hunter.io API key
             timeout: request timeout (HTTP)
             proxy: request proxy (HTTP)
+            recorder: recording of request/response pairs
+            endpoint: base url of a stand-in server to send every request
+              to instead of Hunter.io (benchmarks/testing)
+            egress: pool of proxies to spread requests over, replacing
+              `proxy`
         """
         self.domain = domain
         self.api_key = api_key
@@ -39,6 +62,67 @@ class Hunter(object):
 
         self.url = f"{self.HUNTER_BASE}?domain={self.domain}&api_key={self.api_key}"
         self.session = requests.Session()
+        self.recorder = recorder
+        self.endpoint = endpoint
+        self.egress = egress
+
+    def _http_req(self, url: str) -> requests.Response:
+        """Send a request to Hunter.io, recording the response when a
+        recording is enabled.
+
+        Arguments:
+            url: url to request
+
+        Returns:
+            response
+
+        Raises:
+            requests.exceptions.RequestException: if the request failed
+              (through every proxy tried)
+        """
+        # Fail over to another proxy of the egress pool when one times out
+        # or cannot connect
+        attempts = min(len(self.egress), MAX_ATTEMPTS) if self.egress else 1
+
+        for attempt in range(attempts):
+            proxies = self.proxy
+            endpoint = None
+            if self.egress:
+                endpoint = self.egress.acquire_sync()
+                if endpoint is None:
+                    raise requests.exceptions.ProxyError("Every proxy is down")
+
+                proxies = {"http": endpoint.url, "https": endpoint.url}
+
+            start = time.monotonic()
+            ok = None
+
+            try:
+                response = requests.get(
+                    rewrite_url(url, self.endpoint) if self.endpoint else url,
+                    headers=HTTP_HEADERS,
+                    timeout=self.timeout,
+                    proxies=proxies,
+                    verify=False,
+                )
+                ok = True
+                break
+
+            except EGRESS_ERRORS as e:
+                ok = False
+                if not endpoint or attempt + 1 == attempts:
+                    raise
+
+                logging.debug(f"Request through {endpoint.url} failed, failing over: {e!r}")  # fmt: skip
+
+            finally:
+                if endpoint:
+                    self.egress.release(endpoint, ok, time.monotonic() - start)
+
+        if self.recorder:
+            self.recorder.record("Hunter", url, response.status_code, response.text)
+
+        return response
 
     def hunt_format(self) -> str:
         """Query Hunter.io for username format based on the
@@ -51,13 +135,7 @@ class Hunter(object):
             KeyError: if no username format pattern found, return None
         """
         try:
-            response = requests.get(
-                self.url,
-                headers=HTTP_HEADERS,
-                timeout=self.timeout,
-                proxies=self.proxy,
-                verify=False,
-            )
+            response = self._http_req(self.url)
             results = response.json()
 
             format_ = results["data"]["pattern"]
@@ -89,13 +167,7 @@ class Hunter(object):
             url = f"{self.url}&limit=100&offset={offset}"
 
             try:
-                response = requests.get(
-                    url,
-                    headers=HTTP_HEADERS,
-                    timeout=self.timeout,
-                    proxies=self.proxy,
-                    verify=False,
-                )
+                response = self._http_req(url)
                 results = response.json()
 
                 # As long as we get email results, continue
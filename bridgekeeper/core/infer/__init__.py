@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+import logging
+from typing import (
+    Iterable,
+    List,
+    Tuple,
+)
+
+from bridgekeeper.core.infer.inferer import FormatInferer
+
+
+def infer(
+    names: Iterable[str],
+    emails: Iterable[str],
+    domain: str = None,
+) -> List[Tuple[str, int, float]]:
+    """Infer the username format of a domain offline by scoring
+    candidate formats against known email addresses.
+
+    Arguments:
+        names: employee names
+        emails: known email addresses
+        domain: domain name to infer the username format for
+
+    Returns:
+        list of (username format, matched emails, match rate) ranked by
+          match rate
+    """
+    inferer = FormatInferer(emails=emails, domain=domain)
+    ranked = inferer.infer(names)
+
+    logging.debug(f"Username formats matching known emails: {len(ranked)}")
+
+    return ranked
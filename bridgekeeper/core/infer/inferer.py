@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import logging
+from collections import Counter
+from typing import (
+    Iterable,
+    List,
+    Tuple,
+)
+
+from bridgekeeper.core.transform.collision import collision_key
+from bridgekeeper.core.transform.names import parse_name
+from bridgekeeper.core.transform.template import (
+    UsernameTemplate,
+    trim_template,
+)
+
+
+class FormatInferer(object):
+    """Infer the username format of a domain from known email addresses
+    and employee names, without querying Hunter.io.
+    """
+
+    # Candidate username formats scored against known emails
+    TEMPLATES = [
+        "{first}.{last}",
+        "{f}{last}",
+        "{first}{last}",
+        "{first}_{last}",
+        "{first}-{last}",
+        "{first}{l}",
+        "{first}.{l}",
+        "{f}.{last}",
+        "{first}",
+        "{last}",
+        "{last}{f}",
+        "{last}.{first}",
+        "{last}{first}",
+        "{last}_{first}",
+        "{l}{first}",
+        "{f}{m}{last}",
+        "{f}{m}.{last}",
+        "{first}.{m}.{last}",
+        "{first}{m}{last}",
+        "{f}{l}",
+    ]
+
+    def __init__(
+        self,
+        emails: Iterable[str],
+        domain: str = None,
+        templates: List[str] = None,
+        trims: Iterable[int] = range(1, 9),
+    ):
+        """Initialize FormatInferer instance.
+
+        Arguments:
+            emails: known email addresses
+            domain: domain name to score emails of, defaults to the most
+              common domain of the known emails
+            templates: candidate username formats (without a domain)
+            trims: trim lengths to score for each candidate format
+        """
+        emails = [e.strip().lower() for e in emails if "@" in e]
+
+        if not domain and emails:
+            domain = Counter(e.rsplit("@", 1)[1] for e in emails).most_common(1)[0][0]  # fmt: skip
+
+        self.domain = domain.lower() if domain else None
+        self.templates = templates or self.TEMPLATES
+        self.trims = list(trims)
+
+        # Index the local parts of the target domain's emails. Duplicate
+        # counters (jsmith2) are indexed by their collision key as well
+        self.local_parts = set()
+        self.keys = {}
+        for email in emails:
+            (local, email_domain) = email.rsplit("@", 1)
+            if self.domain and email_domain != self.domain:
+                continue
+
+            self.local_parts.add(local)
+            self.keys.setdefault(collision_key(local), set()).add(local)
+
+        logging.debug(f"Indexed {len(self.local_parts)} emails for: {self.domain}")
+
+    def __candidates(self) -> List[Tuple[str, str]]:
+        """Build the candidate formats, including trimmed variants.
+
+        Returns:
+            list of (candidate format, untrimmed format)
+        """
+        candidates = []
+        for template in self.templates:
+            candidates.append((template, template))
+
+            for trim in self.trims:
+                trimmed = trim_template(template, trim)
+                if trimmed:
+                    candidates.append((trimmed, template))
+
+        return candidates
+
+    def infer(self, names: Iterable[str]) -> List[Tuple[str, int, float]]:
+        """Score every candidate format against the known emails. Each
+        name is rendered once per candidate and looked up in the email
+        index, rather than compared to every email.
+
+        Arguments:
+            names: employee names
+
+        Returns:
+            list of (username format, matched emails, match rate) ranked
+              by match rate
+        """
+        if not self.local_parts:
+            return []
+
+        forms = []
+        for name in names:
+            parsed = parse_name(name.lower())
+            if parsed:
+                forms.extend(parsed.forms)
+
+        scores = {}
+        for (order, (candidate, base)) in enumerate(self.__candidates()):
+            render = UsernameTemplate(candidate).render
+
+            matched = set()
+            for (f, m, l) in forms:
+                username = render(f, m, l)
+
+                if username in self.local_parts:
+                    matched.add(username)
+
+                # Account for numbered duplicates (jsmith -> jsmith2)
+                matched.update(self.keys.get(username, ()))
+
+            scores[candidate] = (len(matched), order, base)
+
+        ranked = []
+        for (candidate, (matches, order, base)) in scores.items():
+            # A trim only tells us something if it matches more emails
+            # than the untrimmed format
+            if not matches or (candidate != base and matches <= scores[base][0]):
+                continue
+
+            ranked.append((candidate, matches, order))
+
+        ranked.sort(key=lambda r: (-r[1], r[2]))
+
+        suffix = f"@{self.domain}" if self.domain else ""
+        return [
+            (f"{candidate}{suffix}", matches, matches / len(self.local_parts))
+            for (candidate, matches, _) in ranked
+        ]
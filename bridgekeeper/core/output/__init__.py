@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Dict,
+    Iterable,
+)
+
+from bridgekeeper.core.output.stream import StreamWriter
+from bridgekeeper.core.output.writer import UsernameWriter
+
+
+def write(
+    usernames: Dict[str, Iterable[str]],
+    output_files: Dict[str, str],
+    shards: int = 1,
+    compression: str = None,
+    workers: int = None,
+) -> Dict[str, int]:
+    """Write the usernames of each username format template to its own
+    file(s), writing templates concurrently. Compression and file I/O
+    release the GIL, so threads are enough to overlap them.
+
+    Arguments:
+        usernames: dictionary of username templates -> usernames
+        output_files: dictionary of username templates -> output file
+        shards: number of files to split each template's usernames across
+        compression: compression to apply (gzip, xz)
+        workers: number of templates to write at once
+
+    Returns:
+        dictionary of username templates -> number of usernames written
+    """
+    writers = {
+        template: UsernameWriter(output_files[template], shards, compression)
+        for template in usernames.keys()
+    }
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            template: executor.submit(writers[template].write, usernames[template])
+            for template in usernames.keys()
+        }
+
+        return {template: future.result() for (template, future) in futures.items()}
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import json
+import sys
+from typing import (
+    Iterable,
+    Tuple,
+)
+
+
+class StreamWriter(object):
+    """Write usernames to stdout or a file as they are generated."""
+
+    FORMATS = ["plain", "ndjson"]
+
+    def __init__(
+        self,
+        output_file: str = "-",
+        format_: str = "plain",
+    ):
+        """Initialize StreamWriter instance.
+
+        Arguments:
+            output_file: file to write usernames to (`-` for stdout)
+            format_: output format: `plain` (one username per line) or
+              `ndjson` (one {template, name, username} object per line)
+
+        Raises:
+            ValueError: if the output format is not supported
+        """
+        if format_ not in self.FORMATS:
+            raise ValueError(f"Invalid stream format: '{format_}'")
+
+        self.output_file = output_file
+        self.format = format_
+        self.count = 0
+
+        if output_file == "-":
+            self.fp = sys.stdout
+        else:
+            self.fp = open(output_file, "w")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, template: str, name: str, username: str):
+        """Write a single username.
+
+        Arguments:
+            template: username format template
+            name: name the username was generated from
+            username: generated username
+        """
+        if self.format == "ndjson":
+            record = {"template": template, "name": name, "username": username}
+            self.fp.write(json.dumps(record) + "\n")
+        else:
+            self.fp.write(f"{username}\n")
+
+        self.count += 1
+
+    def write_all(self, records: Iterable[Tuple[str, str, str]]):
+        """Write usernames as they are produced by an iterator.
+
+        Arguments:
+            records: iterable of (username template, name, username)
+        """
+        for (template, name, username) in records:
+            self.write(template, name, username)
+
+    def close(self):
+        """Flush the stream and close the output file, if any"""
+        if self.fp is sys.stdout:
+            self.fp.flush()
+        else:
+            self.fp.close()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+import gzip
+import logging
+import lzma
+from typing import Iterable
+
+
+class UsernameWriter(object):
+    """Write usernames to one or more evenly sized, optionally
+    compressed, files using large buffered writes.
+    """
+
+    # Compression -> (file extension, opener)
+    COMPRESSION = {
+        None: ("", open),
+        "gzip": (".gz", gzip.open),
+        "xz": (".xz", lzma.open),
+    }
+
+    def __init__(
+        self,
+        output_file: str,
+        shards: int = 1,
+        compression: str = None,
+        buffer_size: int = 1024 * 1024,
+    ):
+        """Initialize UsernameWriter instance.
+
+        Arguments:
+            output_file: file to write usernames to (i.e. `output/x.txt`),
+              shards are numbered before the extension, padded to at least
+              3 digits (`output/x_001.txt`)
+            shards: number of files to split usernames across
+            compression: compression to apply (gzip, xz)
+            buffer_size: number of bytes buffered per shard between writes
+
+        Raises:
+            ValueError: if the compression is not supported
+        """
+        if compression not in self.COMPRESSION:
+            raise ValueError(f"Invalid compression: '{compression}'")
+
+        self.shards = max(1, shards)
+        self.buffer_size = buffer_size
+
+        (extension, self.opener) = self.COMPRESSION[compression]
+
+        if self.shards == 1:
+            self.files = [output_file + extension]
+
+        else:
+            (base, dot, suffix) = output_file.rpartition(".")
+            if not dot:
+                (base, suffix) = (output_file, "")
+
+            width = max(3, len(str(self.shards)))
+            self.files = [
+                f"{base}_{i:0{width}d}{dot}{suffix}{extension}"
+                for i in range(1, self.shards + 1)
+            ]
+
+    def write(self, usernames: Iterable[str]) -> int:
+        """Write usernames, distributing them round-robin so the shards
+        stay evenly sized (and sorted, if the usernames are sorted).
+
+        Arguments:
+            usernames: usernames to write
+
+        Returns:
+            number of usernames written
+        """
+        fps = [self.opener(f, "wt") for f in self.files]
+        buffers = [[] for _ in fps]
+        sizes = [0] * len(fps)
+
+        count = 0
+        try:
+            for username in usernames:
+                shard = count % self.shards
+                count += 1
+
+                buffers[shard].append(username)
+                sizes[shard] += len(username) + 1
+
+                if sizes[shard] >= self.buffer_size:
+                    fps[shard].write("\n".join(buffers[shard]) + "\n")
+                    buffers[shard] = []
+                    sizes[shard] = 0
+
+            for (fp, buffer) in zip(fps, buffers):
+                if buffer:
+                    fp.write("\n".join(buffer) + "\n")
+
+        finally:
+            for fp in fps:
+                fp.close()
+
+        for f in self.files:
+            logging.debug(f"Wrote usernames to: {f}")
+
+        return count
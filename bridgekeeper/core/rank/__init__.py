@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+import logging
+from typing import (
+    Dict,
+    Iterable,
+    List,
+)
+
+from bridgekeeper.core.rank.ranker import Ranker
+from bridgekeeper.core.transform import compile_templates
+
+
+def rank(
+    format_: str,
+    names: Iterable[str],
+    scores: Dict[str, float] = None,
+    sightings: Dict[str, int] = None,
+    known: Iterable[str] = None,
+    top: int = None,
+) -> List[str]:
+    """Convert names to provided username format(s) and order every
+    username from most to least likely.
+
+    Arguments:
+        format_: format(s) to transform names (comma delimited)
+        names: names to transform
+        scores: dictionary of username templates -> confidence score
+        sightings: dictionary of names -> number of search engines that
+          found them
+        known: usernames known to be valid (i.e. Hunter.io emails)
+        top: number of usernames to keep (all when None)
+
+    Returns:
+        ranked usernames
+    """
+    ranker = Ranker(
+        templates=compile_templates(format_),
+        scores=scores,
+        sightings=sightings,
+    )
+
+    for (template, position) in ranker.positions.items():
+        logging.debug(f"Ranked username format #{position + 1}: '{template}'")
+
+    return ranker.rank(names, known=known, top=top)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import heapq
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+)
+
+from bridgekeeper.core.transform.collision import CollisionIndex
+from bridgekeeper.core.transform.names import parse_name
+from bridgekeeper.core.transform.template import UsernameTemplate
+
+
+class Ranker(object):
+    """Order generated usernames from most to least likely.
+
+    Templates are ordered by their confidence score, falling back to the
+    order they were given in. Within a template, usernames of names seen
+    by more search engines come first and duplicates (JSmith1, JSmith2)
+    follow every unnumbered username.
+    """
+
+    def __init__(
+        self,
+        templates: Dict[str, UsernameTemplate],
+        scores: Dict[str, float] = None,
+        sightings: Dict[str, int] = None,
+    ):
+        """Initialize Ranker instance.
+
+        Arguments:
+            templates: dictionary of username templates -> compiled templates
+            scores: dictionary of username templates -> confidence score
+              (i.e. Hunter.io or inferred match rate)
+            sightings: dictionary of names -> number of search engines
+              that found them
+        """
+        self.templates = templates
+        self.sightings = sightings or {}
+
+        scores = scores or {}
+        order = list(templates.keys())
+
+        # Position of each template in the ranked output
+        ranked = sorted(order, key=lambda t: (-scores.get(t, 0), order.index(t)))
+        self.positions = {template: i for (i, template) in enumerate(ranked)}
+
+    def candidates(
+        self,
+        names: Iterable[str],
+        known: Iterable[str] = None,
+    ) -> Iterator[Tuple[Tuple[int, bool, int, int, int], str]]:
+        """Generate every username with its sort key. Duplicates are
+        numbered in input order, so the usernames are the same as the
+        ones written per template.
+
+        Arguments:
+            names: names to transform
+            known: usernames known to be valid (i.e. Hunter.io emails),
+              these are ranked ahead of every generated username
+
+        Yields:
+            (sort key, username)
+        """
+        seen = set()
+        for (seq, username) in enumerate(known or ()):
+            if username not in seen:
+                seen.add(username)
+                yield ((-1, False, 0, 0, seq), username)
+
+        indexes = {template: CollisionIndex() for template in self.templates.keys()}
+        plan = [
+            (self.positions[t], self.templates[t].render, indexes[t].number)
+            for t in self.templates.keys()
+        ]
+
+        seq = 0
+        for name in names:
+            parsed = parse_name(name)
+            if not parsed:
+                continue
+
+            engines = -self.sightings.get(parsed.name, 0)
+            forms = parsed.forms
+            for (position, render, number) in plan:
+                for (f, m, l) in forms:
+                    (username, count) = number(render(f, m, l))
+                    if username not in seen:
+                        # Duplicates go after every unnumbered username,
+                        # however many engines saw their name
+                        yield ((position, count > 0, engines, count, seq), username)  # fmt: skip
+
+            seq += 1
+
+    def rank(
+        self,
+        names: Iterable[str],
+        known: Iterable[str] = None,
+        top: int = None,
+    ) -> List[str]:
+        """Rank usernames from most to least likely. A username rendered
+        by more than a single template (or name) is ranked once, where it
+        ranks best. When only the top usernames are requested, a bounded
+        heap keeps just those instead of sorting every username.
+
+        Arguments:
+            names: names to transform
+            known: usernames known to be valid (i.e. Hunter.io emails)
+            top: number of usernames to keep (all when None)
+
+        Returns:
+            ranked usernames
+        """
+        best = {}
+        for (key, username) in self.candidates(names, known):
+            if username not in best or key < best[username]:
+                best[username] = key
+
+        candidates = ((key, username) for (username, key) in best.items())
+
+        if top is None:
+            ranked = sorted(candidates)
+        else:
+            ranked = heapq.nsmallest(top, candidates)
+
+        return [username for (_, username) in ranked]
@@ -1,16 +1,26 @@
 #!/usr/bin/env python3
 
+import aiohttp  # type: ignore
+import asyncio
 import logging
+from contextlib import AsyncExitStack
 from typing import (
+    AsyncIterator,
     Dict,
     List,
+    Tuple,
 )
 
+from bridgekeeper.core.scrape.cache import ResponseCache
+from bridgekeeper.core.scrape.parse import ParserPool
+from bridgekeeper.core.scrape.scheduler import set_rate_limits
 from bridgekeeper.core.scrape.scraper import Scraper
 from bridgekeeper.utils.defaults import START_SCRIPT
+from bridgekeeper.utils.egress import EgressPool
+from bridgekeeper.utils.record import Recorder
 
 
-def scrape(
+async def scrape_async(
     company: str,
     output_dir: str,
     depth: int = 5,
@@ -20,10 +30,28 @@ def scrape(
     duckduckgo_cookies: Dict[str, str] = None,
     google_cookies: Dict[str, str] = None,
     yahoo_cookies: Dict[str, str] = None,
-) -> List[str]:
+    merge_distance: int = None,
+    session: aiohttp.ClientSession = None,
+    quiet: bool = False,
+    cache: ResponseCache = None,
+    recorder: Recorder = None,
+    endpoint: str = None,
+    parse_workers: int = 0,
+    parser: ParserPool = None,
+    prefetch: int = 1,
+    min_novelty: float = 0.0,
+    novelty_patience: int = 2,
+    max_requests: int = None,
+    max_time: float = None,
+    fan_out: int = 1,
+    aliases: List[str] = None,
+    titles: List[str] = None,
+    locations: List[str] = None,
+    egress: EgressPool = None,
+) -> Dict[str, int]:
     """Scrape Bing, DuckDuckGo, Google, and Yahoo for LinkedIn profiles
-    by invoking the Scraper module. Write found names to a file in a
-    designated output directory.
+    by invoking the Scraper module on the running event loop. Write found
+    names to a file in a designated output directory.
 
     Arguments:
         company: name of company to scrape (i.e. 'Example Ltd.')
@@ -32,9 +60,35 @@ def scrape(
         timeout: request timeout (HTTP)
         proxy: request proxy (HTTP)
         *_cookies: search engine cookies
+        merge_distance: maximum edit distance to merge near-duplicate
+          names across search engines (disabled when None)
+        session: http session shared with other scrapes
+        quiet: do not print the scrape progress
+        cache: on-disk cache of search engine responses
+        recorder: recording of request/response pairs
+        endpoint: base url of a stand-in server to send every request to
+          instead of the search engines (benchmarks/testing)
+        parse_workers: number of processes to parse pages with, pages are
+          parsed on the event loop when 0
+        parser: process pool shared with other scrapes
+        prefetch: maximum number of page requests in flight at once per
+          search engine
+        min_novelty: minimum share of new names per page before a search
+          engine is considered dry (0 disables the check)
+        novelty_patience: number of consecutive dry pages before a search
+          engine stops early
+        max_requests: maximum number of requests across all search
+          engines, shared out by how many new names each brings
+        max_time: maximum number of seconds to keep sending requests
+        fan_out: maximum number of sub-queries to scrape each search engine
+          with (aliases, titles and locations of the company)
+        aliases: other names of the company
+        titles: job titles to narrow sub-queries down to
+        locations: locations to narrow sub-queries down to
+        egress: pool of proxies to spread requests over, replacing `proxy`
 
     Returns:
-        list of names
+        dictionary of names -> number of search engines that found them
     """
     scraper = Scraper(
         company=company,
@@ -45,8 +99,26 @@ def scrape(
         duckduckgo_cookies=duckduckgo_cookies,
         google_cookies=google_cookies,
         yahoo_cookies=yahoo_cookies,
+        merge_distance=merge_distance,
+        session=session,
+        quiet=quiet,
+        cache=cache,
+        recorder=recorder,
+        endpoint=endpoint,
+        parse_workers=parse_workers,
+        parser=parser,
+        prefetch=prefetch,
+        min_novelty=min_novelty,
+        novelty_patience=novelty_patience,
+        max_requests=max_requests,
+        max_time=max_time,
+        fan_out=fan_out,
+        aliases=aliases,
+        titles=titles,
+        locations=locations,
+        egress=egress,
     )
-    scraper.loop.run_until_complete(scraper.run())
+    await scraper.run()
 
     # Create file to write users to: <example_ltd>_names_<date>.txt
     company = company.strip().strip(".")
@@ -59,4 +131,175 @@ def scrape(
             for name in scraper.employees:
                 f.write(f"{name}\n")
 
-    return scraper.employees
+    # Record which names were merged: <example_ltd>_merged_<date>.txt
+    if scraper.merges:
+        merged_file = f"{output_dir}/{company_fname}_merged_{START_SCRIPT}.txt"
+        logging.debug(f"Writing merged names to the following file: {merged_file}")
+        with open(merged_file, "a") as f:
+            for (name, merged) in scraper.merges.items():
+                f.write(f"{name}\t{', '.join(merged)}\n")
+
+    # Record the yield of each sub-query: <example_ltd>_queries_<date>.txt
+    if scraper.queries:
+        queries_file = f"{output_dir}/{company_fname}_queries_{START_SCRIPT}.txt"
+        logging.debug(f"Writing sub-query yields to the following file: {queries_file}")  # fmt: skip
+        with open(queries_file, "a") as f:
+            f.write("query\trequests\tnames\tunique\n")
+            for (query, stats) in scraper.queries.items():
+                f.write(f"{query}\t{stats['requests']}\t{stats['names']}\t{stats['unique']}\n")  # fmt: skip
+
+    return {name: scraper.sightings[name] for name in scraper.employees}
+
+
+def scrape(
+    company: str,
+    output_dir: str,
+    depth: int = 5,
+    timeout: float = 25,
+    proxy: str = None,
+    bing_cookies: Dict[str, str] = None,
+    duckduckgo_cookies: Dict[str, str] = None,
+    google_cookies: Dict[str, str] = None,
+    yahoo_cookies: Dict[str, str] = None,
+    merge_distance: int = None,
+    cache: ResponseCache = None,
+    recorder: Recorder = None,
+    endpoint: str = None,
+    parse_workers: int = 0,
+    prefetch: int = 1,
+    min_novelty: float = 0.0,
+    novelty_patience: int = 2,
+    max_requests: int = None,
+    max_time: float = None,
+    fan_out: int = 1,
+    aliases: List[str] = None,
+    titles: List[str] = None,
+    locations: List[str] = None,
+    egress: EgressPool = None,
+) -> Dict[str, int]:
+    """Scrape Bing, DuckDuckGo, Google, and Yahoo for LinkedIn profiles
+    by invoking the Scraper module. Write found names to a file in a
+    designated output directory.
+
+    Arguments:
+        company: name of company to scrape (i.e. 'Example Ltd.')
+        output_dir: directory where to write names file to
+        depth: number of pages deep to scrape per search engine
+        timeout: request timeout (HTTP)
+        proxy: request proxy (HTTP)
+        *_cookies: search engine cookies
+        merge_distance: maximum edit distance to merge near-duplicate
+          names across search engines (disabled when None)
+        cache: on-disk cache of search engine responses
+        recorder: recording of request/response pairs
+        endpoint: base url of a stand-in server to send every request to
+          instead of the search engines (benchmarks/testing)
+        parse_workers: number of processes to parse pages with, pages are
+          parsed on the event loop when 0
+        prefetch: maximum number of page requests in flight at once per
+          search engine
+        min_novelty: minimum share of new names per page before a search
+          engine is considered dry (0 disables the check)
+        novelty_patience: number of consecutive dry pages before a search
+          engine stops early
+        max_requests: maximum number of requests across all search
+          engines, shared out by how many new names each brings
+        max_time: maximum number of seconds to keep sending requests
+        fan_out: maximum number of sub-queries to scrape each search engine
+          with (aliases, titles and locations of the company)
+        aliases: other names of the company
+        titles: job titles to narrow sub-queries down to
+        locations: locations to narrow sub-queries down to
+        egress: pool of proxies to spread requests over, replacing `proxy`
+
+    Returns:
+        dictionary of names -> number of search engines that found them
+    """
+    return asyncio.run(
+        scrape_async(
+            company=company,
+            output_dir=output_dir,
+            depth=depth,
+            timeout=timeout,
+            proxy=proxy,
+            bing_cookies=bing_cookies,
+            duckduckgo_cookies=duckduckgo_cookies,
+            google_cookies=google_cookies,
+            yahoo_cookies=yahoo_cookies,
+            merge_distance=merge_distance,
+            cache=cache,
+            recorder=recorder,
+            endpoint=endpoint,
+            parse_workers=parse_workers,
+            prefetch=prefetch,
+            min_novelty=min_novelty,
+            novelty_patience=novelty_patience,
+            max_requests=max_requests,
+            max_time=max_time,
+            fan_out=fan_out,
+            aliases=aliases,
+            titles=titles,
+            locations=locations,
+            egress=egress,
+        )
+    )
+
+
+async def scrape_companies(
+    companies: List[str],
+    output_dir: str,
+    **kwargs,
+) -> AsyncIterator[Tuple[str, Dict[str, int]]]:
+    """Scrape many companies at once on a single http session. Each
+    company has its own scraper state, while search engine rate limits,
+    the egress proxies and the parser processes are shared by all of them.
+
+    Arguments:
+        companies: names of companies to scrape (i.e. ['Example Ltd.'])
+        output_dir: directory where to write names files to
+        **kwargs: scrape_async() arguments applied to every company
+
+    Yields:
+        (company, dictionary of names -> number of search engines that
+          found them) as soon as each company is done, no names if it
+          failed
+    """
+    parse_workers = kwargs.pop("parse_workers", 0)
+
+    async with AsyncExitStack() as stack:
+        session = await stack.enter_async_context(aiohttp.ClientSession())
+
+        parser = None
+        if parse_workers:
+            parser = stack.enter_context(ParserPool(parse_workers))
+
+        async def target(company: str) -> Tuple[str, Dict[str, int]]:
+            # A failing company must not take the rest of the batch down
+            try:
+                names = await scrape_async(
+                    company,
+                    output_dir,
+                    session=session,
+                    quiet=True,
+                    parser=parser,
+                    **kwargs,
+                )
+
+            except Exception as e:
+                logging.error(f"Failed to scrape {company}: {e}")
+                names = {}
+
+            return (company, names)
+
+        tasks = [asyncio.ensure_future(target(c)) for c in companies]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+
+        # Stop the remaining companies when the caller stops early (or
+        # is cancelled) instead of leaving them running on a closed session
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
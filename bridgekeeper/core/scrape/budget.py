@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+import asyncio
+import math
+import time
+from collections import Counter
+from typing import (
+    Dict,
+    List,
+)
+
+
+class RequestBudget(object):
+    """Share a request and/or time budget between the search engines of
+    a scrape based on how many new names each of them brings per request.
+
+    Each engine is weighted by an upper confidence bound (UCB1) on its
+    yield - new names (unseen by any engine) per request - and may use a
+    share of the request budget in proportion to its weight. An engine is
+    held back once it has used up its share, so the rest of the budget
+    goes to the most productive engines; the engine with the highest
+    weight is never held back. A time budget alone is not shared out, as
+    each engine has its own rate limit, it only stops every engine once
+    the time is up.
+    """
+
+    # Weight of the exploration bonus against the observed yield
+    EXPLORATION = 0.25
+
+    def __init__(self, max_requests: int = None, max_time: float = None):
+        """Initialize RequestBudget instance. Must be created on the event
+        loop it is used from.
+
+        Arguments:
+            max_requests: maximum number of requests across all engines
+            max_time: maximum number of seconds to keep sending requests
+        """
+        self.max_requests = max_requests
+        self.deadline = time.monotonic() + max_time if max_time else None
+
+        self.active = set()
+        self.requests = Counter()
+        self.found = Counter()
+        self.seen = set()
+
+        # Largest number of names on a single page, to scale yields to [0, 1]
+        self.scale = 1
+
+        self.changed = asyncio.Condition()
+
+    @property
+    def remaining(self) -> float:
+        """Number of requests left in the budget"""
+        if self.max_requests is None:
+            return math.inf
+
+        return self.max_requests - sum(self.requests.values())
+
+    def weight(self, engine: str) -> float:
+        """UCB1 weight of a search engine, unexplored engines start out
+        with an optimistic yield.
+
+        Arguments:
+            engine: search engine name
+
+        Returns:
+            weight
+        """
+        n = self.requests[engine]
+        total = sum(self.requests.values())
+
+        mean = (self.found[engine] / self.scale + 1) / (n + 1)
+        bonus = self.EXPLORATION * math.sqrt(math.log(total + 1) / (n + 1))
+        return mean + bonus
+
+    def register(self, engine: str):
+        """Start sharing the budget with a search engine.
+
+        Arguments:
+            engine: search engine name
+        """
+        self.active.add(engine)
+
+    def __allowed(self, engine: str) -> bool:
+        """Check if a search engine may send its next request"""
+        weights = {e: self.weight(e) for e in self.active}
+        if engine not in weights or self.max_requests is None:
+            return True
+
+        # The best engine always goes ahead (ties broken by name)
+        best = max(weights, key=lambda e: (weights[e], e))
+        if engine == best:
+            return True
+
+        # Others go ahead while within their share of the budget
+        share = self.max_requests * weights[engine] / sum(weights.values())
+        return self.requests[engine] < share
+
+    async def acquire(self, engine: str) -> bool:
+        """Wait until a search engine may send its next request.
+
+        Arguments:
+            engine: search engine name
+
+        Returns:
+            if the request may be sent, False once the budget is spent
+        """
+        async with self.changed:
+            while True:
+                if self.remaining <= 0:
+                    return False
+
+                timeout = None
+                if self.deadline is not None:
+                    timeout = self.deadline - time.monotonic()
+                    if timeout <= 0:
+                        return False
+
+                if self.__allowed(engine):
+                    self.requests[engine] += 1
+                    return True
+
+                try:
+                    await asyncio.wait_for(self.changed.wait(), timeout)
+
+                except asyncio.TimeoutError:
+                    return False
+
+    def release(self, engine: str):
+        """Give back a request that was granted but never sent.
+
+        Arguments:
+            engine: search engine name
+        """
+        self.requests[engine] -= 1
+        self.__notify()
+
+    def report(self, engine: str, names: List[str]):
+        """Account for the names found on a page.
+
+        Arguments:
+            engine: search engine name
+            names: names found on the page
+        """
+        new = set(names) - self.seen
+        self.seen.update(new)
+
+        self.found[engine] += len(new)
+        self.scale = max(self.scale, len(names))
+        self.__notify()
+
+    def finish(self, engine: str):
+        """Stop sharing the budget with a search engine (i.e. it ran out
+        of results), handing its share to the others.
+
+        Arguments:
+            engine: search engine name
+        """
+        self.active.discard(engine)
+        self.__notify()
+
+    def __notify(self):
+        """Let held back engines check again"""
+
+        async def notify():
+            async with self.changed:
+                self.changed.notify_all()
+
+        asyncio.ensure_future(notify())
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Requests sent and new names found per search engine"""
+        return {
+            engine: {"requests": self.requests[engine], "names": self.found[engine]}
+            for engine in sorted(self.requests)
+        }
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import (
+    Dict,
+    Optional,
+)
+
+
+class ResponseCache(object):
+    """On-disk cache of search engine responses, addressed by a hash of
+    the search engine, URL and cookie profile of each request.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = 86400,
+        max_size: int = 256 * 1024 * 1024,
+        offline: bool = False,
+    ):
+        """Initialize ResponseCache instance.
+
+        Arguments:
+            directory: directory to store cached responses in
+            ttl: seconds a cached response stays fresh
+            max_size: maximum size of the cache in bytes, the least
+              recently written responses are evicted beyond it
+            offline: only serve responses from the cache, regardless of
+              their age
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.ttl = ttl
+        self.max_size = max_size
+        self.offline = offline
+
+        self.size = sum(f.stat().st_size for f in self.__entries())
+
+    def __entries(self):
+        """Cached response files"""
+        return (f for f in self.directory.glob("*/*") if f.is_file())
+
+    def __path(self, key: str) -> Path:
+        """Path of a cached response, sharded on the first byte of the key"""
+        return self.directory / key[:2] / key
+
+    def key(
+        self,
+        engine: str,
+        url: str,
+        cookies: Dict[str, str] = None,
+    ) -> str:
+        """Build the cache key of a request.
+
+        Arguments:
+            engine: search engine name
+            url: request url
+            cookies: request cookies
+
+        Returns:
+            cache key
+        """
+        profile = json.dumps(sorted((cookies or {}).items()))
+        data = f"{engine.lower()}\n{url}\n{profile}".encode("utf-8")
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, key: str, ttl: float = None) -> Optional[bytes]:
+        """Get a cached response.
+
+        Arguments:
+            key: cache key
+            ttl: seconds the response stays fresh, overriding the cache
+              TTL (i.e. short-lived tokens)
+
+        Returns:
+            cached response or None if missing or expired
+        """
+        path = self.__path(key)
+        ttl = self.ttl if ttl is None else ttl
+
+        try:
+            if not self.offline and time.time() - path.stat().st_mtime > ttl:
+                return None
+
+            return path.read_bytes()
+
+        except OSError:
+            return None
+
+    def put(self, key: str, response: bytes):
+        """Cache a response, evicting the oldest responses if the cache
+        grows beyond its maximum size.
+
+        Arguments:
+            key: cache key
+            response: response to cache
+        """
+        path = self.__path(key)
+        path.parent.mkdir(exist_ok=True)
+
+        try:
+            previous = path.stat().st_size if path.exists() else 0
+
+            # Write to a temporary file first so a reader never sees a
+            # partially written response
+            (fd, tmp) = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "wb") as f:
+                f.write(response)
+
+            os.replace(tmp, path)
+            self.size += path.stat().st_size - previous
+
+        except OSError as e:
+            logging.debug(f"Failed to cache response: {e}")
+            return
+
+        if self.size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        """Delete the least recently written responses until the cache
+        is back under its maximum size, with some headroom so the next
+        few writes do not trigger another eviction.
+        """
+        target = self.max_size * 0.9
+
+        entries = []
+        for f in self.__entries():
+            stat = f.stat()
+            entries.append((stat.st_mtime, stat.st_size, f))
+
+        entries.sort()
+        self.size = sum(size for (_, size, _) in entries)
+
+        for (_, size, f) in entries:
+            if self.size <= target:
+                break
+
+            try:
+                f.unlink()
+                self.size -= size
+
+            except OSError:
+                pass
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import logging
+from typing import (
+    Dict,
+    List,
+    Tuple,
+)
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance between two strings, giving up once the
+    distance is known to exceed a limit.
+
+    Arguments:
+        a: first string
+        b: second string
+        limit: maximum distance of interest
+
+    Returns:
+        edit distance (limit + 1 if it exceeds the limit)
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for (i, ca) in enumerate(a, 1):
+        current = [i]
+        for (j, cb) in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ca != cb),
+                )
+            )
+
+        if min(current) > limit:
+            return limit + 1
+
+        previous = current
+
+    return previous[-1]
+
+
+class NameMerger(object):
+    """Merge near-duplicate names found across search engines (i.e. Jon
+    Smith, Jon A Smith and Jon Smith-Jones). Names are blocked on their
+    first initial and primary surname, so only names within the same
+    block are ever compared.
+    """
+
+    def __init__(self, max_distance: int = 1):
+        """Initialize NameMerger instance.
+
+        Arguments:
+            max_distance: maximum edit distance between two names (first
+              name and primary surname) to consider them the same person
+        """
+        self.max_distance = max_distance
+
+    def __split(self, name: str) -> Tuple[str, str, str]:
+        """Normalize a name into (first, middle, primary surname).
+
+        Arguments:
+            name: name to normalize
+
+        Returns:
+            (first, middle, primary surname)
+        """
+        tokens = name.lower().split()
+        first = tokens[0]
+        middle = tokens[1] if len(tokens) > 2 else ""
+
+        # Key hyphenated surnames on their first component so
+        # Smith-Jones lands in the same block as Smith
+        surname = tokens[-1].split("-")[0] or tokens[-1]
+
+        return (first, middle, surname)
+
+    def __compatible(
+        self,
+        a: Tuple[str, str, str],
+        b: Tuple[str, str, str],
+    ) -> bool:
+        """Check if two normalized names refer to the same person.
+
+        Arguments:
+            a: normalized name
+            b: normalized name
+
+        Returns:
+            if the names are near-duplicates
+        """
+        # A middle name/initial only conflicts when both names have one
+        if a[1] and b[1] and a[1][0] != b[1][0]:
+            return False
+
+        distance = edit_distance(f"{a[0]} {a[2]}", f"{b[0]} {b[2]}", self.max_distance)  # fmt: skip
+        return distance <= self.max_distance
+
+    def merge(
+        self,
+        names: Dict[str, int],
+    ) -> Tuple[List[str], Dict[str, List[str]]]:
+        """Merge near-duplicate names.
+
+        Within each block, names are visited from most to least likely
+        (seen by the most engines, then the most complete) and each one
+        joins the first cluster it is compatible with.
+
+        Arguments:
+            names: dictionary of names -> number of engines that saw them
+
+        Returns:
+            (names kept, dictionary of kept name -> names merged into it)
+        """
+        blocks = {}
+        for name in names.keys():
+            if not name.split():
+                continue
+
+            normalized = self.__split(name)
+            key = (normalized[0][:1], normalized[2])
+            blocks.setdefault(key, []).append((name, normalized))
+
+        kept = []
+        merges = {}
+        for block in blocks.values():
+            block.sort(
+                key=lambda n: (-names[n[0]], -len(n[0].split()), -len(n[0]), n[0])
+            )
+
+            # Each cluster tracks the first middle name merged into it so
+            # Jon A Smith and Jon B Smith never share a leader
+            clusters = []
+            for (name, normalized) in block:
+                for cluster in clusters:
+                    if self.__compatible(normalized, cluster[1]):
+                        merges.setdefault(cluster[0], []).append(name)
+                        if normalized[1] and not cluster[1][1]:
+                            cluster[1] = (cluster[1][0], normalized[1], cluster[1][2])  # fmt: skip
+
+                        break
+
+                else:
+                    clusters.append([name, normalized])
+                    kept.append(name)
+
+        for (leader, merged) in merges.items():
+            logging.debug(f"Merged names into '{leader}': {', '.join(merged)}")
+
+        return (kept, merges)
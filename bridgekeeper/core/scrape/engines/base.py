@@ -1,26 +1,41 @@
 #!/usr/bin/env python3
 
+import aiohttp  # type: ignore
+import asyncio
 import logging
 import re
-import requests  # type: ignore
-import urllib3  # type: ignore
+import time
 from typing import (
     Dict,
     List,
 )
 
+from bridgekeeper.core.scrape.budget import RequestBudget
+from bridgekeeper.core.scrape.cache import ResponseCache
+from bridgekeeper.core.scrape.novelty import NoveltyTracker
+from bridgekeeper.core.scrape.planner import Query
+from bridgekeeper.core.scrape.parse import (
+    ParsedPage,
+    ParserPool,
+)
+from bridgekeeper.core.scrape.progress import ScrapeProgress
+from bridgekeeper.core.scrape.scheduler import bucket
 from bridgekeeper.utils.defaults import HTTP_HEADERS
-
-
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from bridgekeeper.utils.egress import (
+    EGRESS_ERRORS,
+    MAX_ATTEMPTS,
+    EgressPool,
+)
+from bridgekeeper.utils.helper import check_substring
+from bridgekeeper.utils.record import (
+    Recorder,
+    rewrite_url,
+)
 
 
 class ScraperEngine:
     """Search Engine scraper engine base"""
 
-    # Shared data sets
-    progress = {}
-
     def __init__(
         self,
         company: str,
@@ -28,6 +43,18 @@ class ScraperEngine:
         timeout: float = 25,
         proxy: str = None,
         cookies: Dict[str, str] = None,
+        session: aiohttp.ClientSession = None,
+        progress: ScrapeProgress = None,
+        cache: ResponseCache = None,
+        recorder: Recorder = None,
+        endpoint: str = None,
+        parser: ParserPool = None,
+        prefetch: int = 1,
+        min_novelty: float = 0.0,
+        novelty_patience: int = 2,
+        budget: RequestBudget = None,
+        query: Query = None,
+        egress: EgressPool = None,
     ):
         """Initialize Scraper engine base.
 
@@ -37,42 +64,289 @@ class ScraperEngine:
             timeout: request timeout (HTTP)
             proxy: request proxy (HTTP)
             cookies: session cookies
+            session: http session shared with other engines, a session
+              is opened for the engine itself when not provided
+            progress: progress of the scrape the engine is part of
+            cache: on-disk cache of search engine responses
+            recorder: recording of request/response pairs
+            endpoint: base url of a stand-in server to send every request
+              to instead of the search engine (benchmarks/testing)
+            parser: process pool to parse pages in, pages are parsed on
+              the event loop when not provided
+            prefetch: maximum number of page requests in flight at once,
+              for search engines with predictable page urls
+            min_novelty: minimum share of new names per page before the
+              search engine is considered dry (0 disables the check)
+            novelty_patience: number of consecutive dry pages before
+              stopping early
+            budget: request budget shared with the other engines of the
+              scrape (unlimited when not provided)
+            query: sub-query of the company to search for (Default: the
+              company itself)
+            egress: pool of proxies to spread requests over, replacing
+              `proxy`
         """
         # Inherited data sets
         self.company = company
         self.depth = depth
-        self.timeout = timeout
-        self.proxy = None if not proxy else {"http": proxy, "https": proxy}
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
         self.cookies = cookies
 
-        # Create http session
-        self.session = requests.Session()
-        self._init_session()
+        # aiohttp requires the proxy scheme, requests assumed http://
+        if proxy and "://" not in proxy:
+            proxy = f"http://{proxy}"
+
+        self.proxy = proxy
+        self.egress = egress
+
+        # Http session - cookies, proxy and timeout are sent per request so
+        # a single session can be shared by every engine
+        self.session = session
+
+        # Progress is tracked per scrape, never across scrapes
+        self.progress = progress or ScrapeProgress(depth)
+        self.cache = cache
+        self.recorder = recorder
+        self.endpoint = endpoint
+        self.parser = parser
+        self.prefetch = max(1, prefetch)
+
+        # Stop paging early once pages stop bringing new names or repeat
+        self.novelty = NoveltyTracker(min_novelty, novelty_patience)
+        self.budget = budget
+        self.spent = False
+        self.query = query or Query(company)
+
+        # Requests sent, not served from the cache
+        self.requests = 0
 
         # Local data sets
         self.url = None
         self.engine = None
 
-    def _init_session(self):
-        """Initialize http session"""
-        if self.cookies:
-            self.session.cookies.update(self.cookies)
+    @property
+    def task(self) -> str:
+        """Search engine and the sub-query it runs (unless the company
+        itself), naming the engine in logs, the progress and the budget
+        """
+        if self.query == Query(self.company):
+            return self.engine
+
+        return f"{self.engine} {self.query.label}"
+
+    async def run(self) -> List[str]:
+        """Scrape the search engine for LinkedIn profiles based on a
+        company name, opening an http session for the engine when one
+        is not shared.
+
+        Returns:
+            list of names found
+        """
+        if self.budget:
+            self.budget.register(self.task)
+
+        try:
+            if self.session is not None:
+                return await self._scrape()
+
+            async with aiohttp.ClientSession() as self.session:
+                try:
+                    return await self._scrape()
+
+                finally:
+                    self.session = None
+
+        finally:
+            # Hand the rest of the budget to the other engines
+            if self.budget:
+                self.budget.finish(self.task)
+
+    def _page_url(self, index: int) -> str:
+        """Url of a search result page, implemented by each engine with
+        predictable page urls
+
+        Arguments:
+            index: page number (starting at 0)
+
+        Returns:
+            page url
+        """
+        raise NotImplementedError
+
+    def _stop_early(self, page: ParsedPage, index: int) -> bool:
+        """Check whether a page shows the search engine has run dry,
+        logging why when it has.
 
-        if self.proxy:
-            self.session.proxies.update(self.proxy)
+        Arguments:
+            page: parsed page
+            index: page number (starting at 0)
+
+        Returns:
+            if paging should stop
+        """
+        reason = self.novelty.update(page)
+        if not reason:
+            return False
+
+        logging.info(f"Stopping {self.task} after {index + 1} pages: {reason}")
+
+        # Adjust progress bar accordingly
+        self.progress.finish(self.task)
+
+        return True
+
+    def _stop_spent(self, index: int):
+        """Log that the request budget of the scrape stopped the search
+        engine, if it did.
+
+        Arguments:
+            index: page number (starting at 0) that was not requested
+        """
+        if not self.spent:
+            return
+
+        logging.info(f"Stopping {self.task} after {index} pages: request budget spent")  # fmt: skip
+
+        # Adjust progress bar accordingly
+        self.progress.finish(self.task)
+
+    async def _fetch_page(self, index: int) -> ParsedPage:
+        """Fetch and parse a search result page.
+
+        Arguments:
+            index: page number (starting at 0)
+
+        Returns:
+            parsed page or None if the request failed
+        """
+        response = await self._http_req(self._page_url(index))
+        if not response:
+            return None
+
+        return await self._parse(response)
+
+    async def _scrape(self) -> List[str]:
+        """Scrape the search engine for LinkedIn profiles based on a
+        company name, page by page. Up to `prefetch` pages are requested
+        ahead (still within the search engine rate limit), but pages are
+        merged in order and requests past the last page are cancelled.
+
+        Returns:
+            list of names found
+        """
+        logging.debug(f"Gathering names from {self.task} (depth={self.depth}, prefetch={self.prefetch})")  # fmt: skip
+
+        names = []
+        pending = {}
+        ahead = 0
 
-    def _print_status(self):
-        """Print the status of the current scraping - for all search engines"""
         try:
-            total = self.depth * len(self.progress)
-            current = sum(self.progress[k] for k in self.progress.keys())
-            percent = (current / total) * 100.0
-            print("[*] Progress: {0:.0f}%".format(percent), end="\r")
+            for index in range(self.depth):
+                # Keep the next pages in flight
+                while ahead < min(self.depth, index + self.prefetch):
+                    pending[ahead] = asyncio.ensure_future(self._fetch_page(ahead))
+                    ahead += 1
+
+                page = await pending.pop(index)
+
+                if page is None:
+                    self._stop_spent(index)
+                    break
+
+                # Check for CAPTCHA in response
+                if page.captcha:
+                    logging.error(f"CAPTCHA triggered for {self.task}, ending coroutine")  # fmt: skip
 
-        except ZeroDivisionError:
-            pass
+                    # Adjust progress bar accordingly
+                    self.progress.finish(self.task)
 
-    def _get_name(self, data: str) -> str:
+                    break
+
+                self.progress.advance(self.task)
+
+                if self.budget:
+                    self.budget.report(self.task, page.names)
+
+                # Assume we hit the final page if there are no results
+                if not page.results:
+                    logging.debug(f"Stopping {self.task} after {index + 1} pages: no more results")  # fmt: skip
+                    break
+
+                names.extend(page.names)
+
+                if self._stop_early(page, index):
+                    break
+
+        finally:
+            # Cancel requests for pages past the last one
+            for task in pending.values():
+                task.cancel()
+
+            if pending:
+                await asyncio.gather(*pending.values(), return_exceptions=True)
+
+        return names
+
+    @classmethod
+    def parse_page(cls, content: bytes, company: str) -> ParsedPage:
+        """Extract the names from a search result page, implemented by
+        each engine. Runs in a parser process, so it must not depend on
+        any instance state.
+
+        Arguments:
+            content: response body
+            company: name of the company scraped for
+
+        Returns:
+            parsed page
+        """
+        raise NotImplementedError
+
+    async def _parse(self, content: bytes) -> ParsedPage:
+        """Parse a search result page in the parser pool, or on the
+        event loop when there is none.
+
+        Arguments:
+            content: response body
+
+        Returns:
+            parsed page
+        """
+        if self.parser:
+            return await self.parser.parse(type(self).parse_page, content, self.query.alias)  # fmt: skip
+
+        return self.parse_page(content, self.query.alias)
+
+    @classmethod
+    def _names(cls, titles: List[str], company: str) -> List[str]:
+        """Clean the names out of search result titles.
+
+        Arguments:
+            titles: search result titles
+            company: name of the company scraped for
+
+        Returns:
+            list of names
+        """
+        names = []
+        for title in titles:
+            try:
+                name = cls._get_name(title)
+                name = cls._clean(name)
+
+                # While maybe not the best approach, attempt to avoid
+                # found names that are just job titles ending with the
+                # company and/or LinkedIn
+                if not check_substring(name, company) and not check_substring(name, "linkedin"):  # fmt: skip
+                    names.append(name)
+
+            except:
+                pass
+
+        return names
+
+    @staticmethod
+    def _get_name(data: str) -> str:
         """When scraping the name from HTML, make sure to purge bad data.
 
         Arguments:
@@ -83,7 +357,8 @@ class ScraperEngine:
         """
         return re.sub(" (-|–|\xe2\x80\x93).*", "", data)
 
-    def _clean(self, data: str) -> str:
+    @staticmethod
+    def _clean(data: str) -> str:
         """Clean the identified LinkedIn profile name by stripping
         invalid characters and/or Prefixes/Titles/Certs.
 
@@ -127,27 +402,126 @@ class ScraperEngine:
 
         return data.strip()
 
-    def _http_req(self, url: str) -> List[str]:
+    def _cache_url(self, url: str) -> str:
+        """Url a response is cached under, engines drop the parameters that
+        change between sessions without changing the results (i.e. tokens)
+
+        Arguments:
+            url: url to request
+
+        Returns:
+            url to build the cache key from
+        """
+        return url
+
+    async def _http_req(
+        self,
+        url: str,
+        budgeted: bool = True,
+        ttl: float = None,
+    ) -> bytes:
         """Send an HTTP request to a given search engine to scrape
         for LinkedIn profiles based on a company name.
 
         Arguments:
             url: url to request
+            budgeted: if the request counts against the request budget,
+              False for requests that never return names (i.e. tokens)
+            ttl: seconds the cached response stays fresh (Default: the
+              cache TTL)
 
         Returns:
-            list of names found
+            raw response body, left undecoded for the result extraction
         """
-        try:
-            response = self.session.get(
-                url,
-                headers=HTTP_HEADERS,
-                timeout=self.timeout,
-                verify=False,
-            )
-
-            return response.text
-
-        except Exception as e:
-            logging.error(f"Scraping failed for: {self.engine.title()}")
-            logging.debug(f"{e}")
+        # Serve the response from the cache without sending any request
+        if self.cache:
+            key = self.cache.key(self.engine, self._cache_url(url), self.cookies)
+            response = self.cache.get(key, ttl)
+            if response is not None:
+                return response
+
+            if self.cache.offline:
+                logging.debug(f"Response not cached for {self.engine}: {url}")
+                return None
+
+        # Wait for the scrape's request budget to allow another request
+        budget = self.budget if budgeted else None
+        if budget and not await budget.acquire(self.task):
+            logging.debug(f"Request budget spent, not requesting: {url}")
+            self.spent = True
             return None
+
+        # Fail over to another proxy of the egress pool when one times out
+        # or cannot connect
+        attempts = min(len(self.egress), MAX_ATTEMPTS) if self.egress else 1
+
+        for attempt in range(attempts):
+            # Wait for a request slot of the search engine, shared with
+            # every other scrape in the process
+            try:
+                await bucket(self.engine).acquire()
+
+            # The request was never sent, give it back to the budget
+            except asyncio.CancelledError:
+                if budget and attempt == 0:
+                    budget.release(self.task)
+
+                raise
+
+            endpoint = None
+            if self.egress:
+                endpoint = await self.egress.acquire()
+                if endpoint is None:
+                    logging.error(f"Scraping failed for: {self.task} (every proxy is down)")  # fmt: skip
+                    return None
+
+            self.requests += 1
+            start = time.monotonic()
+            ok = None
+
+            try:
+                async with self.session.get(
+                    rewrite_url(url, self.endpoint) if self.endpoint else url,
+                    headers=HTTP_HEADERS,
+                    cookies=self.cookies,
+                    proxy=endpoint.url if endpoint else self.proxy,
+                    timeout=self.timeout,
+                    ssl=False,
+                ) as response:
+                    body = await response.read()
+
+                ok = True
+
+            # Prefetched requests are cancelled past the last page (Python
+            # 3.7 treats cancellation as an Exception)
+            except asyncio.CancelledError:
+                raise
+
+            except EGRESS_ERRORS as e:
+                ok = False
+                if endpoint and attempt + 1 < attempts:
+                    logging.debug(f"Request through {endpoint.url} failed, failing over: {e!r}")  # fmt: skip
+                    continue
+
+                logging.error(f"Scraping failed for: {self.task}")
+                logging.debug(f"{e!r}")
+                return None
+
+            except Exception as e:
+                logging.error(f"Scraping failed for: {self.task}")
+                logging.debug(f"{e}")
+                return None
+
+            finally:
+                if endpoint:
+                    self.egress.release(endpoint, ok, time.monotonic() - start)
+
+            if self.recorder:
+                text = body.decode("utf-8", errors="replace")
+                self.recorder.record(self.engine, url, response.status, text)
+
+            # Never cache a CAPTCHA page, the next run should retry it
+            if self.cache and response.status == 200 and b"CAPTCHA" not in body:
+                self.cache.put(key, body)
+
+            return body
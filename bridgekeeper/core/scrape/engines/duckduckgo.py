@@ -1,13 +1,25 @@
 #!/usr/bin/env python3
 
 import logging
-import random
 import re
-import time
 from typing import List
 
 from bridgekeeper.core.scrape.engines.base import ScraperEngine
-from bridgekeeper.utils.helper import check_substring
+from bridgekeeper.core.scrape.parse import (
+    ParsedPage,
+    page_digest,
+)
+
+
+# Result titles within the JavaScript results
+TITLES = re.compile(rb'"t":"(.+?)",')
+
+# Seconds a cached search token is reused for, tokens are only valid for
+# a short while
+TOKEN_TTL = 300
+
+# Search token parameter of the result page urls
+TOKEN_PARAM = re.compile(r"&vqd=[^&]*")
 
 
 class DuckDuckGoEngine(ScraperEngine):
@@ -19,24 +31,38 @@ class DuckDuckGoEngine(ScraperEngine):
 
         # Init engine
         self.engine = "DuckDuckGo"
-        self.progress[self.engine] = 0
-        self.url = f"https://links.duckduckgo.com/d.js?q=site%3Alinkedin.com%2Fin%2F%20%22%2D%20{self.company}%22&s="
+        self.progress.register(self.task)
+        self.url = f"https://links.duckduckgo.com/d.js?q=site%3Alinkedin.com%2Fin%2F%20{self.query.terms}&s="
 
-        # Send initial request to get
+        # Search token, retrieved by an initial request when scraping
         self.token = None
-        self._init_req()
 
-    def _init_req(self):
+    async def _init_req(self):
         """Send initial request to retrieve custom JavaScript generated token"""
-        url_ = f"https://duckduckgo.com/?q=site%3Alinkedin.com%2Fin%2F%20%22%2D%20{self.company}%22&t=h_"
+        url_ = f"https://duckduckgo.com/?q=site%3Alinkedin.com%2Fin%2F%20{self.query.terms}&t=h_"
 
-        response = self._http_req(url_)
+        # The token page never holds any names, so it is not worth a
+        # request of the budget, and the token expires long before the
+        # pages it is used for do (pages are cached regardless of token)
+        response = await self._http_req(url_, budgeted=False, ttl=TOKEN_TTL)
         if response:
-            token_regex = re.search("vqd='(.+?)';", response)
+            token_regex = re.search(rb"vqd='(.+?)';", response)
             if token_regex:
-                self.token = token_regex.group(1)
+                self.token = token_regex.group(1).decode("utf-8")
+
+    def _cache_url(self, url: str) -> str:
+        """Cache result pages under their query and offset, a new token
+        returns the same results
+
+        Arguments:
+            url: url to request
+
+        Returns:
+            url without the search token
+        """
+        return TOKEN_PARAM.sub("", url)
 
-    def run(self) -> List[str]:
+    async def _scrape(self) -> List[str]:
         """Scrape DuckDuckGo search engine for LinkedIn profiles based
         on a company name
 
@@ -44,90 +70,100 @@ class DuckDuckGoEngine(ScraperEngine):
             list of names found
         """
         # Custom DuckDuckGo handling as search requests require an initial
-        # token
-        if not self.token:
-            logging.error("Could not retrieve DuckDuckGo search token, ending coroutine")  # fmt: skip
-            return []
+        # token, offline runs only read cached pages and need none
+        if not (self.cache and self.cache.offline):
+            await self._init_req()
+            if not self.token:
+                logging.error("Could not retrieve DuckDuckGo search token, ending coroutine")  # fmt: skip
+                return []
 
-        logging.debug(f"Gathering names from {self.engine} (depth={self.depth})")
+        logging.debug(f"Gathering names from {self.task} (depth={self.depth})")
 
         i = 0
         names = []
-        for _ in range(self.depth):
+        for index in range(self.depth):
             # Update current index
             url_ = self.url + str(i)
-            url_ += f"&vqd={self.token}"
+            if self.token:
+                url_ += f"&vqd={self.token}"
 
-            response = self._http_req(url_)
+            response = await self._http_req(url_)
 
             if not response:
+                self._stop_spent(index)
                 break
 
+            page = await self._parse(response)
+
             # Check for CAPTCHA in response
-            if "CAPTCHA" not in response:
-                self.progress[self.engine] += 1
-                self._print_status()
-
-                # DuckDuckGo has slightly different handling than the other
-                # search engines - instead of an HTML response with results,
-                # the results are returned via the Content-Type: x-javascript.
-                # Within the JavaScript, there is JSON data structures for each
-                # result, but instead of trying to parse out the JSON and then
-                # load it as a dictionary - it appears that all result titles
-                # have a key of "t". This appears to be the only visible object
-                # that has a "t" value - so we can just regex the response for
-                # all titles...
-                title_regex = re.findall('"t":"(.+?)",', response)
-
-                if title_regex:
-                    # Account for end of search results via 'EOF'
-                    if len(title_regex) == 1 and "EOF" in title_regex[0]:
-                        # Adjust progress bar accordingly
-                        if self.progress[self.engine] < self.depth:
-                            self.progress[self.engine] = self.depth
-                            self._print_status()
-
-                        break
-
-                    # It seems there isn't a super consistent way to move from
-                    # page to page as the results are dynamically loaded in chunks,
-                    # so we need to get the number of results from the current
-                    # request and shift the index accordingly
-                    i += len(title_regex)
-
-                    for person in title_regex:
-                        try:
-                            name = self._get_name(person)
-                            name = self._clean(name)
-
-                            # While maybe not the best approach, attempt to avoid
-                            # found names that are just job titles ending with the
-                            # company and/or LinkedIn
-                            if (
-                                not check_substring(name, self.company)  # fmt: skip
-                                and not check_substring(name, "linkedin")  # fmt: skip
-                            ):
-                                names.append(name)
-
-                        except:
-                            pass
-
-                else:
-                    # Assume we hit the final page if there are no results
-                    break
-
-                # Search engine blacklist evasion technique
-                # Sleep for random times between a half second and a full second
-                time.sleep(round(random.uniform(1.0, 2.0), 2))
-
-            else:
-                logging.error(f"CAPTCHA triggered for {self.engine}, ending coroutine")
+            if page.captcha:
+                logging.error(f"CAPTCHA triggered for {self.task}, ending coroutine")
+
+                # Adjust progress bar accordingly
+                self.progress.finish(self.task)
+
+                break
+
+            self.progress.advance(self.task)
+
+            if self.budget:
+                self.budget.report(self.task, page.names)
+
+            # Account for end of search results via 'EOF'
+            if page.eof:
+                logging.debug(f"Stopping {self.task} after {index + 1} pages: end of results")  # fmt: skip
 
                 # Adjust progress bar accordingly
-                if self.progress[self.engine] < self.depth:
-                    self.progress[self.engine] = self.depth
-                    self._print_status()
+                self.progress.finish(self.task)
+
+                break
+
+            # Assume we hit the final page if there are no results
+            if not page.results:
+                logging.debug(f"Stopping {self.task} after {index + 1} pages: no more results")  # fmt: skip
+                break
 
+            # It seems there isn't a super consistent way to move from
+            # page to page as the results are dynamically loaded in chunks,
+            # so we need to get the number of results from the current
+            # request and shift the index accordingly
+            i += page.results
+
+            names.extend(page.names)
+
+            if self._stop_early(page, index):
                 break
 
         return names
+
+    @classmethod
+    def parse_page(cls, content: bytes, company: str) -> ParsedPage:
+        """Extract the names from a DuckDuckGo search result page
+
+        Arguments:
+            content: response body
+            company: name of the company scraped for
+
+        Returns:
+            parsed page
+        """
+        if b"CAPTCHA" in content:
+            return ParsedPage([], 0, captcha=True)
+
+        # DuckDuckGo has slightly different handling than the other
+        # search engines - instead of an HTML response with results,
+        # the results are returned via the Content-Type: x-javascript.
+        # Within the JavaScript, there is JSON data structures for each
+        # result, but instead of trying to parse out the JSON and then
+        # load it as a dictionary - it appears that all result titles
+        # have a key of "t". This appears to be the only visible object
+        # that has a "t" value - so we can just regex the response for
+        # all titles...
+        title_regex = TITLES.findall(content)
+
+        if len(title_regex) == 1 and b"EOF" in title_regex[0]:
+            return ParsedPage([], 1, eof=True)
+
+        titles = [t.decode("utf-8", errors="replace") for t in title_regex]
+        names = cls._names(titles, company)
+        return ParsedPage(names, len(titles), digest=page_digest(titles))
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import threading
+from lxml import etree  # type: ignore
+from typing import (
+    List,
+    Optional,
+)
+
+
+# lxml parsers must not be used by two threads at once
+_local = threading.local()
+
+
+def _parser() -> etree.HTMLParser:
+    """HTML parser of the current thread - search engine pages are
+    always decoded as UTF-8, regardless of what (if anything) they declare
+    """
+    if not hasattr(_local, "parser"):
+        _local.parser = etree.HTMLParser(encoding="utf-8", remove_comments=True)
+
+    return _local.parser
+
+
+def has_class(name: str) -> str:
+    """XPath predicate matching elements with a given class among their
+    classes (i.e. `class="a b"` has both class `a` and class `b`)
+
+    Arguments:
+        name: class name
+
+    Returns:
+        XPath predicate
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class Extractor(object):
+    """Extract search results from the raw bytes of a result page with
+    precompiled XPath expressions, without building a BeautifulSoup tree.
+    """
+
+    # String value of an element, i.e. all of its text
+    STRING = etree.XPath("string()", smart_strings=False)
+
+    def __init__(self, results: str, title: str = "."):
+        """Initialize Extractor instance.
+
+        Arguments:
+            results: XPath expression selecting the element of each search
+              result
+            title: XPath expression, relative to a search result, selecting
+              the element or text node holding its title
+        """
+        # Plain strings hold no reference back to the tree, so the tree is
+        # freed as soon as the results are extracted
+        self.results = etree.XPath(results, smart_strings=False)
+        self.title = etree.XPath(title, smart_strings=False)
+
+    def _title(self, result: etree._Element) -> Optional[str]:
+        """Title of a search result, None when it has none"""
+        nodes = self.title(result)
+        if not nodes:
+            return None
+
+        # Text node or element
+        node = nodes[0]
+        return node if isinstance(node, str) else self.STRING(node)
+
+    def extract(self, content: bytes) -> List[str]:
+        """Extract the search results of a page.
+
+        Arguments:
+            content: response body
+
+        Returns:
+            title of each search result (None for results without one)
+        """
+        if not content:
+            return []
+
+        tree = etree.fromstring(content, _parser())
+        if tree is None:
+            return []
+
+        results = [self._title(r) for r in self.results(tree)]
+
+        # Free the tree before the next page is requested
+        del tree
+        return results
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+from typing import Optional
+
+from bridgekeeper.core.scrape.parse import ParsedPage
+
+
+class NoveltyTracker(object):
+    """Track how many new names each page of a search engine brings, to
+    stop paging once the search engine runs dry rather than after a fixed
+    number of pages.
+    """
+
+    def __init__(self, min_novelty: float = 0.0, patience: int = 2):
+        """Initialize NoveltyTracker instance.
+
+        Arguments:
+            min_novelty: minimum share of new names per page (0 disables
+              the novelty check, repeated pages are always detected)
+            patience: number of consecutive pages below the minimum
+              novelty before stopping
+        """
+        self.min_novelty = min_novelty
+        self.patience = max(1, patience)
+
+        self.seen = set()
+        self.digests = set()
+        self.low = 0
+
+    def update(self, page: ParsedPage) -> Optional[str]:
+        """Account for the next page of results.
+
+        Arguments:
+            page: parsed page
+
+        Returns:
+            reason to stop paging or None to keep going
+        """
+        if page.digest in self.digests:
+            return "page repeats a previous page"
+
+        self.digests.add(page.digest)
+
+        names = set(page.names)
+        new = names - self.seen
+        self.seen.update(new)
+
+        novelty = len(new) / len(names) if names else 0.0
+        if novelty < self.min_novelty:
+            self.low += 1
+            if self.low >= self.patience:
+                return f"novelty below {self.min_novelty:.0%} for {self.low} pages"
+
+        else:
+            self.low = 0
+
+        return None
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Callable,
+    List,
+    NamedTuple,
+)
+
+
+class ParsedPage(NamedTuple):
+    """Names extracted from a single search result page"""
+
+    names: List[str]
+    results: int  # number of search results, 0 past the last page
+    captcha: bool = False
+    eof: bool = False  # explicit end of results (DuckDuckGo)
+    digest: str = ""  # hash of the result set, see page_digest()
+
+
+def page_digest(titles: List[str]) -> str:
+    """Hash the result set of a page, regardless of the order of the
+    results, to tell when a search engine serves the same page again.
+
+    Arguments:
+        titles: search result titles
+
+    Returns:
+        hex digest
+    """
+    data = "\n".join(sorted({str(t) for t in titles}))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class ParserPool(object):
+    """Process pool parsing fetched search result pages off the event
+    loop, so parsing uses every core and never delays network I/O.
+
+    Pages go through a bounded queue: once `queue_size` pages are waiting
+    to be parsed, fetchers wait for a free slot before handing over more.
+    """
+
+    def __init__(self, workers: int = None, queue_size: int = None):
+        """Initialize ParserPool instance. Must be created on the event
+        loop it is used from.
+
+        Arguments:
+            workers: number of parser processes (Default: number of CPUs)
+            queue_size: maximum number of pages waiting to be parsed
+              (Default: 4 per process)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or self.workers * 4
+
+        self.slots = asyncio.Semaphore(self.queue_size)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the parser processes"""
+        self.executor.shutdown(wait=True)
+
+    async def parse(
+        self,
+        parse_page: Callable[[bytes, str], ParsedPage],
+        content: bytes,
+        company: str,
+    ) -> ParsedPage:
+        """Parse a page in a parser process.
+
+        Arguments:
+            parse_page: page parser of the search engine (picklable, i.e.
+              a classmethod of the search engine)
+            content: response body
+            company: name of the company scraped for
+
+        Returns:
+            parsed page
+        """
+        async with self.slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, parse_page, content, company
+            )
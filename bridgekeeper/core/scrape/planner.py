@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+import re
+from typing import (
+    List,
+    NamedTuple,
+)
+
+
+# Legal suffixes stripped from the company name to search for its bare
+# name as well (i.e. `Example Ltd.` -> `Example`)
+LEGAL_SUFFIXES = re.compile(
+    r"[\s,]+(ltd|limited|inc|incorporated|llc|llp|lp|plc|corp|corporation|co|company|"
+    r"gmbh|ag|sa|s\.a|sas|sarl|srl|spa|bv|nv|ab|as|oy|pty|pte|se|kk|group|holdings?)\.?$",
+    re.IGNORECASE,
+)  # fmt: skip
+
+# Job titles common enough to split the employees of most companies into
+# result sets of their own
+COMMON_TITLES = [
+    "Engineer",
+    "Manager",
+    "Director",
+    "Analyst",
+    "Consultant",
+    "Developer",
+    "Sales",
+    "Specialist",
+    "Associate",
+    "Administrator",
+    "Coordinator",
+    "Assistant",
+    "Architect",
+    "Accountant",
+    "Designer",
+    "Intern",
+    "Executive",
+    "Technician",
+    "Officer",
+    "Lead",
+]
+
+
+class Query(NamedTuple):
+    """A search engine query for the LinkedIn profiles of a company,
+    optionally narrowed down to a job title and/or location
+    """
+
+    alias: str  # company name as it appears in profile titles
+    title: str = None
+    location: str = None
+
+    @property
+    def label(self) -> str:
+        """Readable form of the query terms"""
+        terms = [f'"- {self.alias}"'] + [f'"{t}"' for t in (self.title, self.location) if t]  # fmt: skip
+        return " ".join(terms)
+
+    @property
+    def terms(self) -> str:
+        """Query terms following `site:linkedin.com/in/` in a search url"""
+        terms = f"%22%2D%20{self.alias}%22"
+        for term in (self.title, self.location):
+            if term:
+                terms += f"%20%22{term}%22"
+
+        return terms
+
+
+def company_aliases(company: str, aliases: List[str] = None) -> List[str]:
+    """Names to search a company under: the company name itself, the name
+    without its legal suffix(es) and any known aliases.
+
+    Arguments:
+        company: name of company (i.e. `Example Ltd.`)
+        aliases: other names of the company
+
+    Returns:
+        list of unique names, the company name first
+    """
+    names = [company]
+
+    bare = company.strip()
+    while LEGAL_SUFFIXES.search(bare):
+        bare = LEGAL_SUFFIXES.sub("", bare).strip()
+
+    if bare:
+        names.append(bare)
+
+    names += [a.strip() for a in aliases or [] if a.strip()]
+
+    # Keep the first occurrence of each name, regardless of case
+    unique = {}
+    for name in names:
+        unique.setdefault(name.lower(), name)
+
+    return list(unique.values())
+
+
+def plan_queries(
+    company: str,
+    fan_out: int = 1,
+    aliases: List[str] = None,
+    titles: List[str] = None,
+    locations: List[str] = None,
+) -> List[Query]:
+    """Expand a company into the sub-queries to scrape each search engine
+    with, most productive first. Each query is capped at the results the
+    search engines serve for it, so narrower sub-queries reach employees
+    the company query alone never gets to.
+
+    The company query always comes first, followed by its aliases, then
+    the broadest aliases narrowed down to the given titles and locations
+    and then to common job titles, until `fan_out` queries are planned.
+
+    Arguments:
+        company: name of company (i.e. `Example Ltd.`)
+        fan_out: maximum number of queries
+        aliases: other names of the company
+        titles: job titles to narrow the queries down to
+        locations: locations to narrow the queries down to
+
+    Returns:
+        list of queries
+    """
+    names = company_aliases(company, aliases)
+
+    # An alias extending another one (i.e. `Example Ltd.` and `Example`)
+    # only finds a subset of its results, so it is not narrowed down
+    roots = [
+        n for n in names
+        if not any(o != n and n.lower().startswith(o.lower()) for o in names)
+    ]  # fmt: skip
+
+    queries = [Query(name) for name in names]
+    queries += [Query(name, title=t) for t in titles or [] for name in roots]
+    queries += [Query(name, location=l) for l in locations or [] for name in roots]  # fmt: skip
+    queries += [Query(name, title=t) for t in COMMON_TITLES for name in roots]
+
+    # Drop repeated queries (i.e. a common title also given as a title)
+    plan = []
+    seen = set()
+    for query in queries:
+        key = tuple((t or "").lower() for t in query)
+        if key not in seen:
+            seen.add(key)
+            plan.append(query)
+
+    return plan[: max(1, fan_out)]
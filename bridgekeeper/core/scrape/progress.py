@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import sys
+
+
+class ScrapeProgress(object):
+    """Progress of a single scrape, across each of its search engines"""
+
+    def __init__(self, depth: int, quiet: bool = False):
+        """Initialize ScrapeProgress instance.
+
+        Arguments:
+            depth: depth of pages to go for each search engine
+            quiet: do not print the progress (i.e. when many scrapes run
+              at once)
+        """
+        self.depth = depth
+        self.quiet = quiet
+
+        # Pages scraped per search engine
+        self.pages = {}
+
+    @property
+    def percent(self) -> float:
+        """Percentage of pages scraped across all search engines"""
+        total = self.depth * len(self.pages)
+        if not total:
+            return 0.0
+
+        return (sum(self.pages.values()) / total) * 100.0
+
+    def register(self, engine: str):
+        """Start tracking a search engine.
+
+        Arguments:
+            engine: search engine name
+        """
+        self.pages[engine] = 0
+
+    def advance(self, engine: str):
+        """Count a scraped page for a search engine.
+
+        Arguments:
+            engine: search engine name
+        """
+        self.pages[engine] += 1
+        self.print_status()
+
+    def finish(self, engine: str):
+        """Mark a search engine as done, even if it stopped early.
+
+        Arguments:
+            engine: search engine name
+        """
+        if self.pages[engine] < self.depth:
+            self.pages[engine] = self.depth
+            self.print_status()
+
+    def print_status(self):
+        """Print the status of the current scraping - for all search engines"""
+        if not self.quiet:
+            print("[*] Progress: {0:.0f}%".format(self.percent), end="\r", file=sys.stderr)  # fmt: skip
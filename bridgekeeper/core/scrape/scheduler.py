@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import asyncio
+import random
+import threading
+import time
+from typing import Dict
+
+from bridgekeeper.utils.defaults import (
+    RATE_LIMIT,
+    RATE_LIMIT_JITTER,
+)
+
+
+class TokenBucket(object):
+    """Token bucket limiting the request rate to a search engine.
+
+    Requests reserve a token up front (the bucket can go into debt), so
+    concurrent requests are handed consecutive slots in the order they
+    asked for them and the rate is never exceeded.
+    """
+
+    def __init__(self, rate: float, burst: float = 1, jitter: float = 0):
+        """Initialize TokenBucket instance.
+
+        Arguments:
+            rate: requests per second
+            burst: number of requests that can be sent back to back
+            jitter: maximum random delay in seconds added on top of each
+              slot (blacklist evasion, it only ever delays requests)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+        # Buckets are shared by every engine in the process, which may be
+        # running on more than a single event loop
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserve the next request slot.
+
+        Returns:
+            seconds to wait before sending the request
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)  # fmt: skip
+            self.updated = now
+
+            self.tokens -= 1
+
+            # Jitter is taken out of the bucket as well, so it pushes back
+            # every later slot and requests stay at least 1/rate apart
+            if self.jitter:
+                self.tokens -= random.uniform(0, self.jitter) * self.rate
+
+            return max(0.0, -self.tokens / self.rate)
+
+    def release(self):
+        """Give back a reserved slot that was never used (its jitter is
+        not given back, it only ever delays later requests)"""
+        with self.lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+    async def acquire(self):
+        """Wait for a request slot"""
+        delay = self.reserve()
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+
+            # The request was cancelled before it was sent (i.e. a
+            # prefetched page past the last page)
+            except asyncio.CancelledError:
+                self.release()
+                raise
+
+
+# Process wide buckets per search engine (lower case engine name)
+_buckets = {}
+_rates = {}
+_jitter = RATE_LIMIT_JITTER
+_lock = threading.Lock()
+
+
+def set_rate_limits(rate_limits: Dict[str, float] = None, jitter: float = None):
+    """Configure the request rate of search engines. Buckets already
+    handed out keep their configuration.
+
+    Arguments:
+        rate_limits: dictionary of search engine -> requests per second
+        jitter: maximum random delay in seconds added to each request
+    """
+    global _jitter
+
+    with _lock:
+        for (engine, rate) in (rate_limits or {}).items():
+            _rates[engine.lower()] = rate
+            _buckets.pop(engine.lower(), None)
+
+        if jitter is not None:
+            _jitter = jitter
+            _buckets.clear()
+
+
+def bucket(engine: str) -> TokenBucket:
+    """Get the token bucket shared by every instance of a search engine.
+
+    Arguments:
+        engine: search engine name
+
+    Returns:
+        token bucket of the search engine
+    """
+    engine = engine.lower()
+
+    with _lock:
+        if engine not in _buckets:
+            _buckets[engine] = TokenBucket(
+                rate=_rates.get(engine, RATE_LIMIT),
+                jitter=_jitter,
+            )
+
+        return _buckets[engine]
@@ -1,8 +1,17 @@
 #!/usr/bin/env python3
 
+import aiohttp  # type: ignore
 import asyncio
 import logging
-from typing import Dict
+from collections import (
+    Counter,
+    defaultdict,
+)
+from contextlib import AsyncExitStack
+from typing import (
+    Dict,
+    List,
+)
 
 from bridgekeeper.core.scrape.engines import (
     BingEngine,
@@ -10,6 +19,17 @@ from bridgekeeper.core.scrape.engines import (
     GoogleEngine,
     YahooEngine,
 )
+from bridgekeeper.core.scrape.budget import RequestBudget
+from bridgekeeper.core.scrape.cache import ResponseCache
+from bridgekeeper.core.scrape.dedupe import NameMerger
+from bridgekeeper.core.scrape.parse import ParserPool
+from bridgekeeper.core.scrape.planner import (
+    Query,
+    plan_queries,
+)
+from bridgekeeper.core.scrape.progress import ScrapeProgress
+from bridgekeeper.utils.egress import EgressPool
+from bridgekeeper.utils.record import Recorder
 
 
 class Scraper:
@@ -25,6 +45,24 @@ class Scraper:
         duckduckgo_cookies: Dict[str, str] = None,
         google_cookies: Dict[str, str] = None,
         yahoo_cookies: Dict[str, str] = None,
+        merge_distance: int = None,
+        session: aiohttp.ClientSession = None,
+        quiet: bool = False,
+        cache: ResponseCache = None,
+        recorder: Recorder = None,
+        endpoint: str = None,
+        parse_workers: int = 0,
+        parser: ParserPool = None,
+        prefetch: int = 1,
+        min_novelty: float = 0.0,
+        novelty_patience: int = 2,
+        max_requests: int = None,
+        max_time: float = None,
+        fan_out: int = 1,
+        aliases: List[str] = None,
+        titles: List[str] = None,
+        locations: List[str] = None,
+        egress: EgressPool = None,
     ):
         """Initialize Scraper instance.
 
@@ -34,14 +72,68 @@ class Scraper:
             timeout: request timeout (HTTP)
             proxy: request proxy (HTTP)
             *_cookies: search engine cookies
+            merge_distance: maximum edit distance to merge near-duplicate
+              names across search engines (disabled when None)
+            session: http session shared with other scrapes, a session is
+              opened for the scrape itself when not provided
+            quiet: do not print the scrape progress
+            cache: on-disk cache of search engine responses
+            recorder: recording of request/response pairs
+            endpoint: base url of a stand-in server to send every request
+              to instead of the search engines (benchmarks/testing)
+            parse_workers: number of processes to parse pages with, pages
+              are parsed on the event loop when 0
+            parser: process pool shared with other scrapes, a pool is
+              started for the scrape itself when not provided
+            prefetch: maximum number of page requests in flight at once
+              per search engine
+            min_novelty: minimum share of new names per page before a
+              search engine is considered dry (0 disables the check)
+            novelty_patience: number of consecutive dry pages before a
+              search engine stops early
+            max_requests: maximum number of requests across all search
+              engines, shared out by how many new names each brings
+            max_time: maximum number of seconds to keep sending requests
+            fan_out: maximum number of sub-queries to scrape each search
+              engine with (aliases, titles and locations of the company)
+            aliases: other names of the company
+            titles: job titles to narrow sub-queries down to
+            locations: locations to narrow sub-queries down to
+            egress: pool of proxies to spread requests over, replacing
+              `proxy`
         """
-        self.loop = asyncio.get_event_loop()
         self.employees = set()
+        self.progress = ScrapeProgress(depth, quiet=quiet)
+        self.session = session
+        self.cache = cache
+        self.recorder = recorder
+        self.endpoint = endpoint
+        self.parse_workers = parse_workers
+        self.parser = parser
+        self.prefetch = prefetch
+        self.min_novelty = min_novelty
+        self.novelty_patience = novelty_patience
+        self.max_requests = max_requests
+        self.max_time = max_time
+        self.fan_out = fan_out
+        self.aliases = aliases
+        self.titles = titles
+        self.locations = locations
+        self.egress = egress
+
+        # Number of search engines each name was found by
+        self.sightings = Counter()
+        self.merges = {}
+        self.engines = 0  # search engines run
+
+        # Requests, names and names no other sub-query found per sub-query
+        self.queries = {}
 
         self.company = company
         self.depth = depth
         self.timeout = timeout
         self.proxy = proxy
+        self.merge_distance = merge_distance
 
         # Search engine cookies
         self.bing_cookies = bing_cookies
@@ -52,48 +144,165 @@ class Scraper:
     async def run(self):
         """Asynchronously send HTTP requests
         Here we are going to create multiple coroutines - one for each
-        search engine. To avoid overloading the search engines and getting
-        blacklisted, we are going to sleep after each request - if we don't
-        contain the coroutines then asyncio will dump requests without waiting.
+        search engine - sharing a single http session. To avoid overloading
+        the search engines and getting blacklisted, each coroutine sleeps
+        after each request without blocking the others. Fetched pages are
+        handed to a pool of parser processes, so parsing never holds up
+        the requests. With a request and/or time budget, the coroutines
+        share it by how many new names each search engine brings.
         """
         logging.debug(f"Launching scraper coroutines")
 
-        # Asyncio Event Loop
-        loop = asyncio.get_event_loop()
+        async with AsyncExitStack() as stack:
+            session = self.session
+            if session is None:
+                session = await stack.enter_async_context(aiohttp.ClientSession())
+
+            parser = self.parser
+            if parser is None and self.parse_workers:
+                parser = stack.enter_context(ParserPool(self.parse_workers))
+
+            budget = None
+            if self.max_requests or self.max_time:
+                budget = RequestBudget(self.max_requests, self.max_time)
+
+            await self.__run(session, parser, budget)
+
+        if budget:
+            summary = ", ".join(
+                f"{engine} {s['requests']} requests/{s['names']} new names"
+                for (engine, s) in budget.summary().items()
+            )
+            logging.info(f"Request budget: {summary}")
+
+        if self.merge_distance is not None:
+            merger = NameMerger(self.merge_distance)
+            (kept, self.merges) = merger.merge(self.sightings)
+
+            # A merged name was sighted as its leader, but the leader can
+            # not be seen by more engines than were run
+            for (leader, names) in self.merges.items():
+                count = self.sightings[leader] + sum(self.sightings[n] for n in names)  # fmt: skip
+                self.sightings[leader] = min(count, self.engines)
+
+            merged = sum(len(m) for m in self.merges.values())
+            logging.info(f"Merged near-duplicate names: {merged}")
+
+            self.employees = set(kept)
+
+    async def __run(
+        self,
+        session: aiohttp.ClientSession,
+        parser: ParserPool,
+        budget: RequestBudget,
+    ):
+        """Run every search engine on a shared http session
 
+        Arguments:
+            session: http session
+            parser: process pool to parse pages in (None to parse pages
+              on the event loop)
+            budget: request budget shared by the search engines (None
+              for no budget)
+        """
         runner_args = {
             "company": self.company,
             "depth": self.depth,
             "timeout": self.timeout,
             "proxy": self.proxy,
             "cookies": None,
+            "session": session,
+            "progress": self.progress,
+            "cache": self.cache,
+            "recorder": self.recorder,
+            "endpoint": self.endpoint,
+            "parser": parser,
+            "prefetch": self.prefetch,
+            "min_novelty": self.min_novelty,
+            "novelty_patience": self.novelty_patience,
+            "budget": budget,
+            "egress": self.egress,
         }
 
-        futures = []
+        # Run each search engine for every sub-query of the company
+        queries = plan_queries(
+            self.company,
+            fan_out=self.fan_out,
+            aliases=self.aliases,
+            titles=self.titles,
+            locations=self.locations,
+        )
+        if len(queries) > 1:
+            logging.info(f"Scraping {len(queries)} sub-queries per search engine")
+
+        runners = []
 
         # NOTE: Disable Bing search engine for the time being as the results
         #       are quite inconsistent - some results include the employee
         #       name, but some only include Job Title - Company...
         engines = [DuckDuckGoEngine, GoogleEngine, YahooEngine]  # , BingEngine
+        self.engines = len(engines)
+
+        for query in queries:
+            for engine in engines:
+                # Apply custom search engine cookies
+                if engine == BingEngine:
+                    runner_args["cookies"] = self.bing_cookies
+                elif engine == DuckDuckGoEngine:
+                    runner_args["cookies"] = self.duckduckgo_cookies
+                elif engine == GoogleEngine:
+                    runner_args["cookies"] = self.google_cookies
+                elif engine == YahooEngine:
+                    runner_args["cookies"] = self.yahoo_cookies
+
+                runners.append(engine(query=query, **runner_args))
+
+                # Reset cookies per engine
+                if runner_args["cookies"]:
+                    runner_args["cookies"] = None
+
+        results = await asyncio.gather(*[r.run() for r in runners])
+
+        # Merge the sub-queries, names are still sighted once per engine
+        by_engine = defaultdict(set)
+        by_query = defaultdict(set)
+        requests = Counter()
+        for (runner, names) in zip(runners, results):
+            by_engine[runner.engine].update(names)
+            by_query[runner.query].update(names)
+            requests[runner.query] += runner.requests
 
-        for engine in engines:
-            # Apply custom search engine cookies
-            if engine == BingEngine:
-                runner_args["cookies"] = self.bing_cookies
-            elif engine == DuckDuckGoEngine:
-                runner_args["cookies"] = self.duckduckgo_cookies
-            elif engine == GoogleEngine:
-                runner_args["cookies"] = self.google_cookies
-            elif engine == YahooEngine:
-                runner_args["cookies"] = self.yahoo_cookies
-
-            engine_runner = engine(**runner_args)
-            futures.append(loop.run_in_executor(None, engine_runner.run))
-
-            # Reset cookies per engine
-            if runner_args["cookies"]:
-                runner_args["cookies"] = None
-
-        for data in asyncio.as_completed(futures):
-            names = await data
+        for names in by_engine.values():
             self.employees.update(names)
+            self.sightings.update(names)
+
+        if len(queries) > 1:
+            self.__report(queries, by_query, requests)
+
+    def __report(
+        self,
+        queries: List[Query],
+        names: Dict[Query, set],
+        requests: Counter,
+    ):
+        """Log the marginal yield of each sub-query, i.e. the names that
+        no other sub-query found
+
+        Arguments:
+            queries: sub-queries
+            names: names found per sub-query
+            requests: requests sent per sub-query
+        """
+        found = Counter(n for q in queries for n in names[q])
+
+        for query in queries:
+            unique = sum(1 for n in names[query] if found[n] == 1)
+            self.queries[query.label] = {
+                "requests": requests[query],
+                "names": len(names[query]),
+                "unique": unique,
+            }
+            logging.info(
+                f"Sub-query {query.label}: {requests[query]} requests, "
+                f"{len(names[query])} names, {unique} found by no other sub-query"
+            )
@@ -1,92 +1,149 @@
 #!/usr/bin/env python3
 
 import logging
-import re
 from typing import (
     Dict,
+    Iterable,
+    Iterator,
     List,
+    Tuple,
 )
 
-from bridgekeeper.core.transform.transformer import Transformer
+from bridgekeeper.core.transform.collision import CollisionIndex
+from bridgekeeper.core.transform.columnar import (
+    NameTable,
+    columnar_available,
+    transform_columnar,
+)
+from bridgekeeper.core.transform.external import transform_external
+from bridgekeeper.core.transform.names import parse_name
+from bridgekeeper.core.transform.parallel import transform_parallel
+from bridgekeeper.core.transform.template import UsernameTemplate
+from bridgekeeper.core.transform.wordlist import WordlistGenerator
+
+
+def compile_templates(format_: str) -> Dict[str, UsernameTemplate]:
+    """Compile comma delimited username format(s) into templates.
+
+    Arguments:
+        format_: format(s) to transform names (comma delimited)
+
+    Returns:
+        dictionary of username templates -> compiled templates
+    """
+    templates = {}
+
+    # Compile each username format template once. If a template is
+    # invalid, skip it
+    for template in [f.strip() for f in format_.split(",")]:
+        try:
+            templates[template] = UsernameTemplate(template)
+
+        except ValueError as e:
+            logging.error(f"{e}")
+
+    return templates
+
+
+def transform_batch(
+    templates: Dict[str, UsernameTemplate],
+    names: Iterable[str],
+) -> Dict[str, set]:
+    """Convert names to compiled username templates in a single pass
+    over the names. Each name is parsed once and fed to every template.
+
+    Arguments:
+        templates: dictionary of username templates -> compiled templates
+        names: names to transform
+
+    Returns:
+        dictionary of username templates -> set of transformed usernames
+    """
+    # Create a collision index per template to identify duplicates so
+    # we can append counters (i.e. JSmith -> JSmith1)
+    indexes = {template: CollisionIndex() for template in templates.keys()}
+    plan = [(templates[t].render, indexes[t].add) for t in templates.keys()]
+
+    for name in names:
+        parsed = parse_name(name)
+        if not parsed:
+            continue
+
+        forms = parsed.forms
+        for (render, add) in plan:
+            for (f, m, l) in forms:
+                add(render(f, m, l))
+
+    return {template: index.usernames for (template, index) in indexes.items()}
+
+
+def iter_usernames(
+    templates: Dict[str, UsernameTemplate],
+    names: Iterable[str],
+    indexes: Dict[str, CollisionIndex] = None,
+) -> Iterator[Tuple[str, str, str]]:
+    """Lazily convert names to compiled username templates, yielding
+    each username as soon as it is generated. The only state kept is
+    the collision index per template used for duplicate numbering.
+
+    Arguments:
+        templates: dictionary of username templates -> compiled templates
+        names: names to transform
+        indexes: dictionary of username templates -> collision index to
+          fill, a new index is created for any template not provided
+
+    Yields:
+        (username template, name, username)
+    """
+    if indexes is None:
+        indexes = {}
+
+    for template in templates.keys():
+        indexes.setdefault(template, CollisionIndex())
+
+    plan = [(t, templates[t].render, indexes[t].add) for t in templates.keys()]
+
+    for name in names:
+        parsed = parse_name(name)
+        if not parsed:
+            continue
+
+        forms = parsed.forms
+        for (template, render, add) in plan:
+            for (f, m, l) in forms:
+                yield (template, parsed.name, add(render(f, m, l)))
 
 
 def transform(
     format_: str,
     names: List[str],
+    workers: int = 1,
+    backend: str = "python",
 ) -> Dict[str, set]:
     """Convert a list of names to provided username format(s).
 
     Arguments:
         format_: format(s) to transform names (comma delimited)
         names: list of names to transform
+        workers: number of processes to transform names with
+        backend: transform backend (python or numpy)
 
     Returns:
-        dictionary of username templates -> list of transformed usernames
+        dictionary of username templates -> set of transformed usernames
     """
-    transformer = Transformer()
-
-    # Create a username template map: format -> empty set
-    usernames = {f.strip(): set() for f in format_.split(",")}
-
-    # Loop over each username format template and transform each
-    # name
-    valid_formatters = ["first", "middle", "last", "f", "m", "l"]
-    for template in usernames.keys():
-        # Check if any of the formatters in the current template
-        # are invalid. If invalid, pop from list
-        # Find all text within formatter identifiers: {...}
-        found_formatters = re.findall(r"\{(.+?)\}", template)
-
-        if any(fmt not in valid_formatters for fmt in found_formatters):
-            logging.error(f"Invalid username format: '{template}'")
-            usernames.pop(template, None)
-
-        else:
-            logging.debug(f"Formatting names: '{template}'")
-
-            for name in names:
-                # Account for blank names
-                name = name.strip()
-                if not name:
-                    continue
-
-                try:
-                    # Pass in the name and format template to perform name
-                    # transformation. Pass in the current list of transformed
-                    # names for the current template to identify duplicates so
-                    # we can append counters (i.e. JSmith -> JSmith1)
-                    usernames[template].add(
-                        transformer.transform(name, template, usernames[template])
-                    )
-
-                    # Handle hyphenated last names. Split the full name on spaces,
-                    # so we isolate the last name and split on hyphens. Then, run
-                    # the full name with all variations of last name (i.e. if the
-                    # last name is Smith-Adams, we transform Smith, Adams,
-                    # Smith-Adams, and SmithAdams)
-                    if "-" in name:
-                        split_name = name.split()
-
-                        first_name = " ".join(split_name[:-1])
-                        last_name = split_name[-1]
-
-                        # Join split last names with fully hyphenated last name
-                        last_names = last_name.split("-") + [
-                            last_name,
-                            last_name.replace("-", ""),
-                        ]
-                        for l_name in last_names:
-                            usernames[template].add(
-                                transformer.transform(
-                                    f"{first_name} {l_name}",
-                                    template,
-                                    usernames[template],
-                                )
-                            )
-
-                except Exception as e:
-                    logging.error(f"Error when attempting to transform: {name}")
-                    logging.debug(f"{e}")
-                    pass
-
-    return usernames
+    templates = compile_templates(format_)
+
+    for template in templates.keys():
+        logging.debug(f"Formatting names: '{template}'")
+
+    if backend == "numpy":
+        table = NameTable(names)
+        if table.exact:
+            return transform_columnar(templates, table)
+
+        logging.warning("Names contain NUL characters, falling back to the python backend")  # fmt: skip
+
+    if workers > 1:
+        return transform_parallel(templates, names, workers)
+
+    return transform_batch(templates, names)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Iterable,
+    Tuple,
+)
+
+
+def collision_key(username: str) -> str:
+    """Build the collision key of a base username. Any two usernames
+    that can collide during duplicate numbering (JSmith, JSmith1 and a
+    base that already ends in digits) share the same key.
+
+    Arguments:
+        username: base username
+
+    Returns:
+        base username without trailing digits
+    """
+    return username.rstrip("0123456789")
+
+
+class CollisionIndex(object):
+    """Track the usernames generated for a single username template and
+    number duplicates in constant time (i.e. JSmith -> JSmith1).
+    """
+
+    def __init__(self, usernames: Iterable[str] = None):
+        """Initialize CollisionIndex instance.
+
+        Arguments:
+            usernames: usernames already taken for the template
+        """
+        self.usernames = set(usernames or ())
+
+        # Next duplicate counter to probe per base username. Every counter
+        # below the stored value is known to be taken
+        self.counters = {}
+
+    def __contains__(self, username: str) -> bool:
+        return username in self.usernames
+
+    def __len__(self) -> int:
+        return len(self.usernames)
+
+    def number(self, username: str) -> Tuple[str, int]:
+        """Claim a unique username for a base username by appending an
+        incrementing integer value when the base is already taken.
+
+        Arguments:
+            username: base username
+
+        Returns:
+            (unique username, duplicate counter - 0 if not numbered)
+        """
+        if username not in self.usernames:
+            self.usernames.add(username)
+            return (username, 0)
+
+        # Skip any counters claimed outside of this base's numbering,
+        # e.g. a base username that already ends in digits (JSmith1)
+        count = self.counters.get(username, 1)
+        while f"{username}{count}" in self.usernames:
+            count += 1
+
+        self.counters[username] = count + 1
+
+        dup = f"{username}{count}"
+        self.usernames.add(dup)
+        return (dup, count)
+
+    def add(self, username: str) -> str:
+        """Claim a unique username for a base username.
+
+        Arguments:
+            username: base username
+
+        Returns:
+            unique username with duplicate count appended, if needed
+        """
+        return self.number(username)[0]
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from bridgekeeper.core.transform.collision import CollisionIndex
+from bridgekeeper.core.transform.names import parse_name
+from bridgekeeper.core.transform.template import UsernameTemplate
+
+
+def columnar_available() -> bool:
+    """Check if the optional NumPy dependency of the columnar backend
+    is installed.
+
+    Returns:
+        if NumPy can be imported
+    """
+    return np is not None
+
+
+class NameTable(object):
+    """Names parsed into first, middle and last columns. Every form of
+    a name (hyphenated last name variations included) is its own row,
+    in the order the scalar path transforms them.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        """Parse names into columns.
+
+        Arguments:
+            names: names to parse
+
+        Raises:
+            ImportError: if NumPy is not installed
+        """
+        if np is None:
+            raise ImportError("The columnar backend requires numpy")
+
+        firsts = []
+        middles = []
+        lasts = []
+
+        # NumPy strings are NUL padded, so a name containing NUL would
+        # not round trip through the columns
+        self.exact = True
+
+        for name in names:
+            tokens = name.split()
+            if not tokens:
+                continue
+
+            if "\x00" in name:
+                self.exact = False
+
+            # Only hyphenated names have more than a single form, split
+            # the rest inline the same way split_name() does
+            if "-" not in name:
+                firsts.append(tokens[0])
+                middles.append(tokens[1] if len(tokens) > 2 else "")
+                lasts.append(tokens[-1])
+                continue
+
+            for (f, m, l) in parse_name(name).forms:
+                firsts.append(f)
+                middles.append(m)
+                lasts.append(l)
+
+        self.rows = len(firsts)
+        self.columns = [
+            np.array(firsts, dtype=str),
+            np.array(middles, dtype=str),
+            np.array(lasts, dtype=str),
+        ]
+
+    def __len__(self) -> int:
+        return self.rows
+
+
+def _slice(column: "np.ndarray", stop: Optional[int]) -> "np.ndarray":
+    """Apply a Python slice stop (`value[:stop]`) to every string in a
+    column.
+
+    Arguments:
+        column: string column
+        stop: slice stop
+
+    Returns:
+        sliced string column
+    """
+    if stop is None:
+        return column
+
+    if stop == 0:
+        return np.zeros(column.shape, dtype="U1")
+
+    # Casting to a narrower string type truncates each value
+    if stop > 0:
+        return column.astype(f"U{stop}")
+
+    # Negative stops depend on the length of each value, so clear the
+    # characters past the stop of each row through a code point view
+    width = column.dtype.itemsize // 4
+    keep = np.maximum(np.char.str_len(column) + stop, 0)
+    points = np.ascontiguousarray(column).view(np.uint32).reshape(-1, width)
+    points = np.where(np.arange(width) < keep[:, None], points, 0)
+
+    return points.astype(np.uint32).view(f"U{width}").ravel()
+
+
+def render_column(
+    template: UsernameTemplate,
+    table: NameTable,
+) -> "np.ndarray":
+    """Apply a compiled template to every row of a name table with
+    whole column slicing and concatenation.
+
+    Arguments:
+        template: compiled username template
+        table: parsed names
+
+    Returns:
+        base username column
+    """
+    sections = list(table.columns)
+
+    for (section, trims) in template.trims:
+        for trim in trims:
+            sections[section] = _slice(sections[section], trim)
+
+    width = len(template.prefix) or 1
+    usernames = np.full(len(table), template.prefix, dtype=f"U{width}")
+    for (section, stop, text) in template.fields:
+        usernames = np.char.add(usernames, _slice(sections[section], stop))
+        if text:
+            usernames = np.char.add(usernames, text)
+
+    return usernames
+
+
+def _group_ids(column: "np.ndarray") -> "np.ndarray":
+    """Map every string in a column to an integer id shared by equal
+    strings only.
+
+    Sorting fixed width strings is slow, so strings are hashed to 64 bit
+    integers first. The hashes are only used when no two different
+    strings share one, otherwise the strings are compared directly.
+
+    Arguments:
+        column: string column
+
+    Returns:
+        column of group ids
+    """
+    width = column.dtype.itemsize // 4
+    points = np.ascontiguousarray(column).view(np.uint32).reshape(-1, width)
+
+    # Hash two code points at a time, one contiguous word per step
+    if width % 2:
+        points = np.pad(points, ((0, 0), (0, 1)))
+
+    words = np.ascontiguousarray(points).view(np.uint64).T.copy()
+
+    # FNV-1a over the words, overflow wraps around by design
+    ids = np.full(len(column), 14695981039346656037, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for word in words:
+            ids ^= word
+            ids *= np.uint64(1099511628211)
+
+    order = np.argsort(ids)
+    same = np.flatnonzero(ids[order][1:] == ids[order][:-1])
+    if np.array_equal(column[order[same]], column[order[same + 1]]):
+        return ids
+
+    return np.unique(column, return_inverse=True)[1].ravel()
+
+
+def occurrence_ranks(usernames: "np.ndarray") -> "np.ndarray":
+    """Count the previous occurrences of each value in a column.
+
+    Arguments:
+        usernames: base username column
+
+    Returns:
+        column of occurrence ranks (0 for the first occurrence)
+    """
+    ids = _group_ids(usernames)
+
+    # Stable sort keeps the rows of each value in input order
+    order = np.argsort(ids, kind="stable")
+    grouped = ids[order]
+
+    starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+    sizes = np.diff(np.r_[starts, len(grouped)])
+
+    ranks = np.empty(len(usernames), dtype=np.int64)
+    ranks[order] = np.arange(len(grouped)) - np.repeat(starts, sizes)
+
+    return ranks
+
+
+def number_column(usernames: "np.ndarray") -> set:
+    """Number duplicate base usernames with a vectorized group by and
+    count, matching CollisionIndex numbering of the same input order.
+
+    The n-th repeat of a base becomes base + n. That is exactly what
+    CollisionIndex produces unless a numbered username lands on another
+    row's username (JSmith twice and a base of JSmith1). Those rows are
+    confined to their collision key, so only the groups holding such a
+    clash are renumbered with CollisionIndex.
+
+    Arguments:
+        usernames: base username column in input order
+
+    Returns:
+        set of unique usernames
+    """
+    ranks = occurrence_ranks(usernames)
+
+    # Only repeated rows need a counter appended
+    repeats = np.flatnonzero(ranks)
+    digits = len(str(int(ranks.max()))) if len(repeats) else 0
+    numbered = usernames.astype(f"U{usernames.dtype.itemsize // 4 + digits}")
+    numbered[repeats] = np.char.add(usernames[repeats], ranks[repeats].astype(str))
+
+    # The set is the output either way, so it doubles as the clash check
+    unique = set(numbered.tolist())
+    if len(unique) == len(numbered):
+        return unique
+
+    # A clash needs a base that already ends in digits (JSmith1) and stays
+    # within its collision key, so only those groups are searched for
+    # clashes, on hashed usernames
+    keys = np.char.rstrip(usernames, "0123456789")
+    suspects = np.flatnonzero(keys != usernames)
+    rows = np.flatnonzero(np.isin(keys, np.unique(keys[suspects])))
+
+    ids = _group_ids(numbered[rows])
+    order = np.argsort(ids)
+    same = rows[order[np.flatnonzero(ids[order][1:] == ids[order][:-1]) + 1]]
+
+    # Renumber the groups holding a clash, every other row keeps its
+    # vectorized username
+    clashes = np.flatnonzero(np.isin(keys, np.unique(keys[same])))
+
+    index = CollisionIndex()
+    for username in usernames[clashes].tolist():
+        index.add(username)
+
+    unique.difference_update(numbered[clashes].tolist())
+    unique.update(index.usernames)
+    return unique
+
+
+def transform_columnar(
+    templates: Dict[str, UsernameTemplate],
+    table: NameTable,
+) -> Dict[str, set]:
+    """Convert names to compiled username templates as whole column
+    operations over a table of parsed names.
+
+    Arguments:
+        templates: dictionary of username templates -> compiled templates
+        table: parsed names
+
+    Returns:
+        dictionary of username templates -> set of transformed usernames
+    """
+    usernames = {}
+    for (template, compiled) in templates.items():
+        if not len(table):
+            usernames[template] = set()
+            continue
+
+        usernames[template] = number_column(render_column(compiled, table))
+
+    return usernames
+
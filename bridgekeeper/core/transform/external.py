@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import itertools
+from operator import itemgetter
+from typing import (
+    Dict,
+    Iterable,
+)
+
+from bridgekeeper.core.transform.collision import (
+    CollisionIndex,
+    collision_key,
+)
+from bridgekeeper.core.transform.names import parse_name
+from bridgekeeper.core.transform.template import UsernameTemplate
+from bridgekeeper.utils.extsort import (
+    MAX_FAN_IN,
+    ExternalSorter,
+    open_file_limit,
+)
+
+
+def transform_external(
+    templates: Dict[str, UsernameTemplate],
+    names: Iterable[str],
+    max_memory: int,
+    tmp_dir: str = None,
+) -> Dict[str, ExternalSorter]:
+    """Convert names to compiled username templates without holding the
+    usernames in memory. Base usernames are spilled to disk as sorted
+    runs, grouped by collision key so each group can be numbered in
+    input order on its own, then sorted again into the final output.
+
+    Arguments:
+        templates: dictionary of username templates -> compiled templates
+        names: names to transform
+        max_memory: memory ceiling of the sort buffers in bytes
+        tmp_dir: directory to spill sorted runs to
+
+    Returns:
+        dictionary of username templates -> sorter holding the unique
+          usernames (callers read them via `sorted()` and `close()` it)
+    """
+    # A base and an output sorter per template hold a buffer at the same
+    # time, and the output sorters of every template are merged at once
+    # when written, so share both the memory and open file limits out
+    count = max(1, len(templates))
+    budget = max(1, max_memory // (2 * count))
+    fan_in = max(2, min(MAX_FAN_IN, open_file_limit() // (2 * count) - 1))
+
+    # Record every base username with its position in the input so the
+    # numbering within a collision group follows the input order
+    bases = {t: ExternalSorter(budget, tmp_dir, fan_in) for t in templates.keys()}
+    plan = [(templates[t].render, bases[t].add) for t in templates.keys()]
+
+    seq = 0
+    for name in names:
+        parsed = parse_name(name)
+        if not parsed:
+            continue
+
+        for (f, m, l) in parsed.forms:
+            for (render, add) in plan:
+                username = render(f, m, l)
+                add((collision_key(username), seq, username))
+
+            seq += 1
+
+    # Only usernames sharing a collision key can collide, so numbering
+    # one group at a time gives the same result as numbering the whole
+    # input at once
+    usernames = {}
+    for (template, sorter) in bases.items():
+        output = ExternalSorter(budget, tmp_dir, fan_in)
+
+        for (_, group) in itertools.groupby(sorter.sorted(), key=itemgetter(0)):
+            index = CollisionIndex()
+            for (_, _, username) in group:
+                output.add(index.add(username))
+
+        sorter.close()
+        usernames[template] = output
+
+    return usernames
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+from typing import (
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+
+class ParsedName(NamedTuple):
+    """A name split into sections once, with the variations of a
+    hyphenated last name already built.
+    """
+
+    name: str
+    first: str
+    middle: str
+    last: str
+    variants: List[Tuple[str, str, str]]
+
+    @property
+    def forms(self) -> List[Tuple[str, str, str]]:
+        """Every (first, middle, last) form to transform, in order"""
+        return [(self.first, self.middle, self.last)] + self.variants
+
+
+def split_name(name: str) -> Tuple[str, str, str]:
+    """Split a name into its first, middle and last sections.
+
+    Arguments:
+        name: name to split (format: 'First (M) Last')
+
+    Returns:
+        (first, middle, last)
+    """
+    name = name.split()
+    (f, l) = (name[0], name[-1])
+    m = name[1] if len(name) > 2 else ""
+
+    return (f, m, l)
+
+
+def parse_name(name: str) -> Optional[ParsedName]:
+    """Parse a name into a record to be transformed by any number of
+    username templates.
+
+    Arguments:
+        name: name to parse (format: 'First (M) Last')
+
+    Returns:
+        parsed name or None if the name is blank
+    """
+    # Account for blank names
+    name = name.strip()
+    if not name:
+        return None
+
+    (f, m, l) = split_name(name)
+
+    # Handle hyphenated last names. Split the full name on spaces,
+    # so we isolate the last name and split on hyphens. Then, build
+    # the full name with all variations of last name (i.e. if the
+    # last name is Smith-Adams, we transform Smith, Adams,
+    # Smith-Adams, and SmithAdams)
+    variants = []
+    if "-" in name:
+        split_name_ = name.split()
+
+        first_name = " ".join(split_name_[:-1])
+        last_name = split_name_[-1]
+
+        # Join split last names with fully hyphenated last name
+        last_names = last_name.split("-") + [
+            last_name,
+            last_name.replace("-", ""),
+        ]
+        for l_name in last_names:
+            variant = f"{first_name} {l_name}".strip()
+
+            # A bare hyphen leaves nothing to transform
+            if not variant:
+                break
+
+            variants.append(split_name(variant))
+
+    return ParsedName(name, f, m, l, variants)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+import multiprocessing
+import queue
+import zlib
+from typing import (
+    Dict,
+    List,
+)
+
+from bridgekeeper.core.transform.collision import (
+    CollisionIndex,
+    collision_key,
+)
+from bridgekeeper.core.transform.names import parse_name
+from bridgekeeper.core.transform.template import UsernameTemplate
+
+
+# Seconds between two checks that the worker processes are still alive
+WAIT_INTERVAL = 0.5
+
+
+def shard_of(username: str, shards: int) -> int:
+    """Deterministically map a base username to a shard. The builtin
+    hash() is salted per process, so use a checksum instead.
+
+    Arguments:
+        username: base username
+        shards: number of shards
+
+    Returns:
+        shard number
+    """
+    return zlib.crc32(collision_key(username).encode("utf-8")) % shards
+
+
+def _transform_chunk(
+    templates: List[UsernameTemplate],
+    names: List[str],
+    chunk: int,
+    inboxes: List[multiprocessing.Queue],
+    results: multiprocessing.Queue,
+):
+    """Worker transforming a contiguous chunk of names in a single pass.
+
+    The chunk is rendered and each shard of base usernames is sent
+    straight to the worker numbering that shard (the worker of chunk N
+    numbers shard N). Once it has the shard from every chunk, the worker
+    numbers it in input order and sends the unique usernames back.
+
+    Arguments:
+        templates: compiled username templates
+        names: chunk of names to transform
+        chunk: chunk number, also the shard this worker numbers
+        inboxes: queue of each worker receiving its shard
+        results: queue receiving the numbered shard of each worker
+    """
+    shards = len(inboxes)
+
+    rendered = [[[] for _ in range(shards)] for _ in templates]
+    plan = [(t.render, rendered[i]) for (i, t) in enumerate(templates)]
+
+    for name in names:
+        parsed = parse_name(name)
+        if not parsed:
+            continue
+
+        forms = parsed.forms
+        for (render, buckets) in plan:
+            for (f, m, l) in forms:
+                username = render(f, m, l)
+                buckets[shard_of(username, shards)].append(username)
+
+    # Usernames never hold a newline, so each bucket crosses processes as
+    # a single string instead of a list of small objects
+    for shard in range(shards):
+        inboxes[shard].put((chunk, ["\n".join(b[shard]) for b in rendered]))
+
+    del rendered
+
+    received = sorted(inboxes[chunk].get() for _ in range(shards))
+
+    numbered = []
+    for t in range(len(templates)):
+        index = CollisionIndex()
+        for (_, buckets) in received:
+            if buckets[t]:
+                for username in buckets[t].split("\n"):
+                    index.add(username)
+
+        numbered.append("\n".join(index.usernames))
+
+    results.put(numbered)
+
+
+def transform_parallel(
+    templates: Dict[str, UsernameTemplate],
+    names: List[str],
+    workers: int,
+) -> Dict[str, set]:
+    """Convert names to compiled username templates across worker
+    processes. Each worker renders a contiguous chunk of names and the
+    base usernames are sharded between the workers so every possible
+    collision lands in the same shard, numbered in input order to match
+    a serial run. Workers exchange shards among themselves, the parent
+    process only merges the numbered shards.
+
+    Arguments:
+        templates: dictionary of username templates -> compiled templates
+        names: names to transform
+        workers: number of worker processes
+
+    Returns:
+        dictionary of username templates -> set of transformed usernames
+
+    Raises:
+        RuntimeError: if a worker process fails
+    """
+    keys = list(templates.keys())
+    compiled = [templates[t] for t in keys]
+
+    chunk_size = max(1, -(-len(names) // workers))
+    chunks = [names[i : i + chunk_size] for i in range(0, len(names), chunk_size)]
+    chunks = chunks or [[]]
+
+    inboxes = [multiprocessing.Queue() for _ in chunks]
+    results = multiprocessing.Queue()
+
+    processes = [
+        multiprocessing.Process(
+            target=_transform_chunk,
+            args=(compiled, chunk, i, inboxes, results),
+            daemon=True,
+        )
+        for (i, chunk) in enumerate(chunks)
+    ]
+    for process in processes:
+        process.start()
+
+    usernames = {template: set() for template in keys}
+    try:
+        done = 0
+        while done < len(processes):
+            try:
+                numbered = results.get(timeout=WAIT_INTERVAL)
+
+            # Every worker waits on the others, so one dying stalls them all
+            except queue.Empty:
+                if any(p.exitcode not in (None, 0) for p in processes):
+                    raise RuntimeError("Username transform worker failed")
+
+                continue
+
+            for (template, shard) in zip(keys, numbered):
+                if shard:
+                    usernames[template].update(shard.split("\n"))
+
+            done += 1
+
+    finally:
+        for process in processes:
+            if process.is_alive() and done < len(processes):
+                process.terminate()
+
+            process.join()
+
+    return usernames
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+import re
+import string
+from typing import (
+    List,
+    Optional,
+    Tuple,
+)
+
+
+# Formatter identifiers supported in username templates mapped to the
+# name section they read from (0: first, 1: middle, 2: last) and the
+# slice stop applied when rendering (1: initial only, None: full)
+FORMATTERS = {
+    "first": (0, None),
+    "middle": (1, None),
+    "last": (2, None),
+    "f": (0, 1),
+    "m": (1, 1),
+    "l": (2, 1),
+}
+
+TRIM_REGEX = re.compile(r"\[[-]?[0-9]+\]")
+
+
+class UsernameTemplate(object):
+    """A username format template compiled once into literal segments,
+    field slices and trim lengths so it can be applied to any number of
+    names with slicing and concatenation only.
+    """
+
+    def __init__(self, template: str):
+        """Compile a username format template.
+
+        Arguments:
+            template: username format template (i.e. `{f}{last}[4]`)
+
+        Raises:
+            ValueError: if the template contains an invalid formatter
+              or cannot be parsed
+        """
+        self.template = template
+
+        # Find all text within formatter identifiers: {...}
+        found_formatters = re.findall(r"\{(.+?)\}", template)
+        if any(fmt not in FORMATTERS for fmt in found_formatters):
+            raise ValueError(f"Invalid username format: '{template}'")
+
+        self.trims = self.__compile_trims(template)
+        (self.prefix, self.fields) = self.__compile_segments(template)
+
+    def __compile_trims(self, template: str) -> List[Tuple[int, List[int]]]:
+        """Collect the trim lengths defined for each name section.
+
+        Arguments:
+            template: username format template
+
+        Returns:
+            list of (name section, [trim lengths]) in template order
+        """
+        trims = {}
+
+        # Loop over each formatter in username template (i.e. {f}, {m}, etc.)
+        # We split on the delimeter and then reconstruct the formatters by
+        # adding the delimeter back
+        for item in [("{" + e) for e in template.split("{") if e]:
+            # Check if the user specified a length for the current formatter
+            # Look for: `}[#]`
+            if not re.search(r"}\[[-]?[0-9]+\]", item):
+                continue
+
+            # Grab the trim number: int within [...]
+            trim = int(re.search(r"\[([-]?[0-9]+)\]", item).group(1))
+
+            # Grab the formatter to be trimmed: string within {...}
+            fmt = re.search(r"\{(.+)\}", item).group(1)
+
+            # A trim applies to the name section as a whole, so both the
+            # full and initial formatters read the trimmed value
+            if fmt in FORMATTERS:
+                trims.setdefault(FORMATTERS[fmt][0], []).append(trim)
+
+        return list(trims.items())
+
+    def __compile_segments(
+        self,
+        template: str,
+    ) -> Tuple[str, List[Tuple[int, int, str]]]:
+        """Split the template into literal text and formatter slices.
+
+        Arguments:
+            template: username format template
+
+        Returns:
+            (leading literal text, [(name section, slice stop, trailing
+              literal text)])
+
+        Raises:
+            ValueError: if the template cannot be parsed
+        """
+        literals = [""]
+        sections = []
+        for (text, field, spec, conversion) in string.Formatter().parse(template):
+            literals[-1] += text
+
+            if field is None:
+                continue
+
+            if spec or conversion or field not in FORMATTERS:
+                raise ValueError(f"Invalid username format: '{template}'")
+
+            sections.append(FORMATTERS[field])
+            literals.append("")
+
+        # Trim identifiers are never part of the username
+        literals = [TRIM_REGEX.sub("", text) for text in literals]
+
+        prefix = literals[0]
+        fields = [
+            (section, stop, text)
+            for ((section, stop), text) in zip(sections, literals[1:])
+        ]
+
+        return (prefix, fields)
+
+    def render(self, f: str, m: str, l: str) -> str:
+        """Apply the compiled template to a parsed name.
+
+        Arguments:
+            f: first name string
+            m: middle name string
+            l: last name string
+
+        Returns:
+            username
+        """
+        sections = [f, m, l]
+
+        for (section, trims) in self.trims:
+            value = sections[section]
+            for trim in trims:
+                value = value[:trim]
+
+            sections[section] = value
+
+        return self.prefix + "".join(
+            [sections[section][:stop] + text for (section, stop, text) in self.fields]
+        )
+
+
+def trim_template(template: str, trim: int) -> Optional[str]:
+    """Apply a trim length to the last full name formatter ({first},
+    {middle} or {last}) of a username template.
+
+    Arguments:
+        template: username format template
+        trim: trim length
+
+    Returns:
+        trimmed username template or None if the template has no full
+          name formatter or already defines a trim
+    """
+    if TRIM_REGEX.search(template):
+        return None
+
+    matches = list(re.finditer(r"\{(first|middle|last)\}", template))
+    if not matches:
+        return None
+
+    end = matches[-1].end()
+    return f"{template[:end]}[{trim}]{template[end:]}"
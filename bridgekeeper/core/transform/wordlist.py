@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+import itertools
+import logging
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+)
+
+from bridgekeeper.core.transform.collision import CollisionIndex
+from bridgekeeper.core.transform.names import parse_name
+from bridgekeeper.core.transform.template import (
+    UsernameTemplate,
+    trim_template,
+)
+
+
+class WordlistGenerator(object):
+    """Lazily enumerate the usernames of every username template x trim
+    length x email domain combination as a single wordlist.
+    """
+
+    def __init__(
+        self,
+        templates: List[str],
+        names: Iterable[str],
+        domains: List[str] = None,
+        trims: List[int] = None,
+    ):
+        """Initialize WordlistGenerator instance.
+
+        Arguments:
+            templates: username format templates
+            names: names to transform
+            domains: email domains to append to templates without one
+            trims: trim lengths to apply to the last full name formatter
+              of each template, in addition to the untrimmed template
+        """
+        self.templates = []
+        for template in dict.fromkeys(templates):
+            try:
+                UsernameTemplate(template)
+                self.templates.append(template)
+
+            except ValueError as e:
+                logging.error(f"{e}")
+
+        self.domains = list(dict.fromkeys(domains or []))
+        self.trims = list(dict.fromkeys(trims or []))
+
+        # Parse each name once, the wordlist size depends on the number
+        # of forms (including hyphenated last name variants) per name
+        self.names = [p for p in map(parse_name, names) if p]
+        self.forms = sum(len(p.forms) for p in self.names)
+
+    def __len__(self) -> int:
+        """Exact number of usernames in the wordlist"""
+        return sum(len(domains) for (_, domains) in self.sections()) * self.forms
+
+    def __trimmed(self, template: str) -> List[str]:
+        """Build the trimmed variants of a username template.
+
+        Arguments:
+            template: username format template
+
+        Returns:
+            untrimmed template followed by each trimmed variant
+        """
+        variants = [template]
+        for trim in self.trims:
+            trimmed = trim_template(template, trim)
+            if not trimmed:
+                break
+
+            variants.append(trimmed)
+
+        return variants
+
+    def __domains(self, template: str) -> List[str]:
+        """Build the email domains to append to a username template.
+
+        Arguments:
+            template: username format template
+
+        Returns:
+            list of domains (None when no domain is appended)
+        """
+        # Templates with a domain already are used as is
+        if "@" in template or not self.domains:
+            return [None]
+
+        return self.domains
+
+    def sections(self) -> Iterator[Tuple[str, List[str]]]:
+        """Lazily enumerate each username template x trim length
+        combination along with the domains it is expanded across.
+
+        Yields:
+            (username template, domains)
+        """
+        seen = set()
+
+        for template in self.templates:
+            domains = self.__domains(template)
+
+            for trimmed in self.__trimmed(template):
+                # An explicit trim may match the trimmed variant of
+                # another template (i.e. {last}[4] and {last} + 4)
+                if trimmed in seen:
+                    continue
+
+                seen.add(trimmed)
+                yield (trimmed, domains)
+
+    def generate(self, offset: int = 0, limit: int = None) -> Iterator[str]:
+        """Lazily generate the wordlist.
+
+        Duplicate usernames are numbered per template and trim length
+        before a domain is appended (i.e. JSmith1@example.com), so
+        resuming from an offset replays the numbering of the skipped
+        names of the current section without emitting them.
+
+        Arguments:
+            offset: number of usernames to skip
+            limit: maximum number of usernames to generate
+
+        Yields:
+            usernames
+        """
+        if limit is not None and limit <= 0:
+            return
+
+        remaining = limit
+
+        for (template, domains) in self.sections():
+            size = self.forms * len(domains)
+
+            # Skip entire sections without transforming any names
+            if offset >= size:
+                offset -= size
+                continue
+
+            (skip, skip_domains) = divmod(offset, len(domains))
+            offset = 0
+
+            render = UsernameTemplate(template).render
+            add = CollisionIndex().add
+
+            for parsed in self.names:
+                for (f, m, l) in parsed.forms:
+                    username = add(render(f, m, l))
+
+                    if skip:
+                        skip -= 1
+                        continue
+
+                    for domain in domains[skip_domains:]:
+                        yield (f"{username}@{domain}" if domain else username)
+
+                        if remaining is not None:
+                            remaining -= 1
+                            if remaining == 0:
+                                return
+
+                    skip_domains = 0
+
+    def write(
+        self,
+        output_file: str,
+        offset: int = 0,
+        limit: int = None,
+        chunk_size: int = 100000,
+    ) -> int:
+        """Write the wordlist to a file in chunks. When resuming from an
+        offset, the file must hold at least `offset` usernames: it is cut
+        back to exactly `offset` usernames and the rest are appended.
+
+        Arguments:
+            output_file: file to write the wordlist to
+            offset: number of usernames to skip
+            limit: maximum number of usernames to write
+            chunk_size: number of usernames per write
+
+        Returns:
+            number of usernames written
+
+        Raises:
+            ValueError: if resuming a file holding fewer than `offset`
+              usernames
+        """
+        if offset:
+            self.__rewind(output_file, offset)
+
+        count = 0
+        usernames = self.generate(offset=offset, limit=limit)
+
+        with open(output_file, "a" if offset else "w") as f:
+            while True:
+                chunk = list(itertools.islice(usernames, chunk_size))
+                if not chunk:
+                    break
+
+                f.write("\n".join(chunk) + "\n")
+                count += len(chunk)
+
+                logging.debug(f"Wrote {offset + count} usernames to: {output_file}")
+
+        return count
+
+    @staticmethod
+    def __rewind(output_file: str, offset: int):
+        """Cut a partially written wordlist back to its first `offset`
+        usernames, so resuming never duplicates usernames already written.
+
+        Arguments:
+            output_file: file the wordlist was written to
+            offset: number of usernames to keep
+
+        Raises:
+            ValueError: if the file holds fewer than `offset` usernames
+        """
+        lines = 0
+        try:
+            with open(output_file, "r+b") as f:
+                for line in f:
+                    # A last line without a newline was cut off mid-write
+                    if not line.endswith(b"\n"):
+                        break
+
+                    lines += 1
+                    if lines == offset:
+                        f.truncate(f.tell())
+                        return
+
+        except FileNotFoundError:
+            pass
+
+        raise ValueError(
+            f"Cannot resume from offset {offset}: {output_file} holds {lines} usernames"
+        )  # fmt: skip
@@ -4,6 +4,14 @@ from datetime import datetime
 
 
 START_SCRIPT = datetime.now().strftime("%Y%m%d%H%M")
+
+SEARCH_ENGINES = ["bing", "duckduckgo", "google", "yahoo"]
+
+# Search engine request rate (requests per second) and the maximum random
+# delay (seconds) added to each request as blacklist evasion
+RATE_LIMIT = 1.0
+RATE_LIMIT_JITTER = 1.0
+
 HTTP_HEADERS = {
     "DNT": "1",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+
+import aiohttp  # type: ignore
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+from bridgekeeper.utils.defaults import HTTP_HEADERS
+
+
+# Url requested through each proxy to check it is reachable, any HTTP
+# response counts as healthy
+EGRESS_CHECK_URL = "http://www.gstatic.com/generate_204"
+
+# Weight of the latest request in the latency average of a proxy
+LATENCY_WEIGHT = 0.3
+
+# Maximum multiple of the cooldown a proxy that keeps failing is down for
+MAX_BACKOFF = 8
+
+# Maximum number of proxies a request is tried through
+MAX_ATTEMPTS = 3
+
+# Errors of a proxy (rather than of the server behind it) to fail over on
+EGRESS_ERRORS = (
+    asyncio.TimeoutError,
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientHttpProxyError,
+)
+
+
+def proxy_url(proxy: str) -> str:
+    """Proxy url with its scheme (`host:port` is assumed to be http://)
+
+    Arguments:
+        proxy: `host:port` or proxy url
+
+    Returns:
+        proxy url
+    """
+    return proxy if "://" in proxy else f"http://{proxy}"
+
+
+class Endpoint(object):
+    """Health of a single egress proxy"""
+
+    def __init__(self, url: str):
+        """Initialize Endpoint instance.
+
+        Arguments:
+            url: proxy url
+        """
+        self.url = url
+
+        self.in_use = 0
+        self.successes = 0
+        self.failures = 0  # consecutive failures
+        self.latency = None  # seconds, moving average
+        self.down_until = 0.0  # wall-clock time the proxy is down until
+
+    @property
+    def down(self) -> bool:
+        """If the proxy is cooling down after failing"""
+        return self.down_until > time.time()
+
+    def to_dict(self) -> Dict[str, float]:
+        """Persisted health state"""
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "latency": self.latency,
+            "down_until": self.down_until,
+        }
+
+    def load(self, state: Dict[str, float]):
+        """Restore persisted health state.
+
+        Arguments:
+            state: health state of a previous run
+        """
+        self.successes = state.get("successes", 0)
+        self.failures = state.get("failures", 0)
+        self.latency = state.get("latency")
+        self.down_until = state.get("down_until", 0.0)
+
+
+class EgressPool(object):
+    """Pool of egress proxies shared by the search engine and Hunter.io
+    requests. Each request goes out through the least busy healthy proxy,
+    with at most `concurrency` requests in flight per proxy. A proxy that
+    times out or refuses connections `max_failures` times in a row is taken
+    out of the pool for a cooldown (doubling while it keeps failing) and
+    requests fail over to the other proxies.
+
+    Requests never fall back to a direct connection: once every proxy is
+    down, requests fail.
+    """
+
+    def __init__(
+        self,
+        proxies: List[str],
+        concurrency: int = 4,
+        max_failures: int = 2,
+        cooldown: float = 300,
+        state_file: str = None,
+    ):
+        """Initialize EgressPool instance.
+
+        Arguments:
+            proxies: `host:port` or proxy urls
+            concurrency: maximum number of requests in flight per proxy
+            max_failures: consecutive failures before a proxy is down
+            cooldown: seconds a proxy is down for after failing
+            state_file: JSON file the health of each proxy persists in
+              between runs
+        """
+        self.endpoints = [Endpoint(proxy_url(p)) for p in dict.fromkeys(proxies)]
+        self.concurrency = max(1, concurrency)
+        self.max_failures = max(1, max_failures)
+        self.cooldown = cooldown
+        self.state_file = Path(state_file) if state_file else None
+
+        # Proxies are shared by the search engine coroutines and the
+        # synchronous Hunter.io requests, both waiting for a free slot
+        self.lock = threading.RLock()
+        self.available = threading.Condition(self.lock)
+        self.conditions = {}  # event loop -> asyncio.Condition
+
+        if self.state_file and self.state_file.is_file():
+            self.__load()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def __load(self):
+        """Restore the health of each proxy from the state file"""
+        try:
+            state = json.loads(self.state_file.read_text())
+
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable proxy state: {self.state_file}")
+            logging.debug(f"{e}")
+            return
+
+        for endpoint in self.endpoints:
+            if endpoint.url in state:
+                endpoint.load(state[endpoint.url])
+
+        down = sum(1 for e in self.endpoints if e.down)
+        logging.debug(f"Loaded proxy state: {down}/{len(self)} proxies still down")
+
+    def save(self):
+        """Persist the health of each proxy to the state file"""
+        if not self.state_file:
+            return
+
+        with self.lock:
+            state = {e.url: e.to_dict() for e in self.endpoints}
+
+        # Write to a temporary file first so the state is never truncated
+        directory = self.state_file.parent
+        directory.mkdir(parents=True, exist_ok=True)
+        (fd, tmp) = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f, indent=2)
+
+        os.replace(tmp, self.state_file)
+
+    @property
+    def healthy(self) -> List[Endpoint]:
+        """Proxies not cooling down"""
+        return [e for e in self.endpoints if not e.down]
+
+    def checkout(self) -> Optional[Endpoint]:
+        """Take a request slot of the least busy healthy proxy, without
+        waiting.
+
+        Returns:
+            proxy or None if every healthy proxy is busy
+        """
+        with self.lock:
+            free = [e for e in self.healthy if e.in_use < self.concurrency]
+            if not free:
+                return None
+
+            # Least busy first, then fastest (unmeasured proxies first)
+            endpoint = min(free, key=lambda e: (e.in_use, e.latency or 0.0))
+            endpoint.in_use += 1
+            return endpoint
+
+    async def acquire(self) -> Optional[Endpoint]:
+        """Wait for a request slot of a healthy proxy.
+
+        Returns:
+            proxy or None if every proxy is down
+        """
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            condition = self.conditions.setdefault(loop, asyncio.Condition())
+
+        async with condition:
+            while self.healthy:
+                endpoint = self.checkout()
+                if endpoint:
+                    return endpoint
+
+                await condition.wait()
+
+        return None
+
+    def acquire_sync(self) -> Optional[Endpoint]:
+        """Blocking version of acquire() for synchronous requests.
+
+        Returns:
+            proxy or None if every proxy is down
+        """
+        with self.available:
+            while self.healthy:
+                endpoint = self.checkout()
+                if endpoint:
+                    return endpoint
+
+                self.available.wait()
+
+        return None
+
+    def __notify(self):
+        """Wake every request waiting for a slot (called with the lock
+        held, from any thread)"""
+
+        async def notify(condition: asyncio.Condition):
+            async with condition:
+                condition.notify_all()
+
+        self.available.notify_all()
+
+        for (loop, condition) in list(self.conditions.items()):
+            if loop.is_closed():
+                del self.conditions[loop]
+                continue
+
+            try:
+                loop.call_soon_threadsafe(asyncio.ensure_future, notify(condition))
+
+            # The event loop closed in the meantime
+            except RuntimeError:
+                del self.conditions[loop]
+
+    def release(self, endpoint: Endpoint, ok: bool = None, latency: float = None):
+        """Give back a request slot, accounting for how the request went.
+
+        Arguments:
+            endpoint: proxy
+            ok: if the proxy got a response, False if it timed out or could
+              not connect, None if the request never completed (cancelled)
+            latency: seconds until the response
+        """
+        changed = False
+
+        with self.lock:
+            endpoint.in_use -= 1
+
+            if ok:
+                if endpoint.failures >= self.max_failures:
+                    logging.info(f"Proxy is back up: {endpoint.url}")
+                    changed = True
+
+                endpoint.successes += 1
+                endpoint.failures = 0
+                endpoint.down_until = 0.0
+
+                if latency is not None:
+                    if endpoint.latency is None:
+                        endpoint.latency = latency
+                    else:
+                        endpoint.latency += LATENCY_WEIGHT * (latency - endpoint.latency)  # fmt: skip
+
+            elif ok is False:
+                endpoint.failures += 1
+
+                if endpoint.failures >= self.max_failures:
+                    # Back off further each time a down proxy fails again
+                    backoff = min(2 ** (endpoint.failures - self.max_failures), MAX_BACKOFF)  # fmt: skip
+                    endpoint.down_until = time.time() + self.cooldown * backoff
+                    logging.warning(f"Proxy is down after {endpoint.failures} failures: {endpoint.url}")  # fmt: skip
+                    changed = True
+
+            self.__notify()
+
+        if changed:
+            self.save()
+
+    async def check(self, url: str = EGRESS_CHECK_URL, timeout: float = 10):
+        """Check every proxy not cooling down is reachable, concurrently.
+
+        Arguments:
+            url: url to request through each proxy
+            timeout: request timeout (HTTP)
+        """
+
+        async def probe(session: aiohttp.ClientSession, endpoint: Endpoint):
+            start = time.monotonic()
+            try:
+                async with session.get(
+                    url,
+                    headers=HTTP_HEADERS,
+                    proxy=endpoint.url,
+                    timeout=aiohttp.ClientTimeout(total=timeout),
+                    ssl=False,
+                ) as response:
+                    await response.read()
+
+                self.release(endpoint, True, time.monotonic() - start)
+
+            except Exception as e:
+                logging.warning(f"Proxy check failed, taking it down: {endpoint.url}")
+                logging.debug(f"{e!r}")
+
+                # A failed check takes the proxy down right away
+                with self.lock:
+                    endpoint.in_use -= 1
+                    endpoint.failures = max(endpoint.failures, self.max_failures)
+                    endpoint.down_until = time.time() + self.cooldown
+                    self.__notify()
+
+        with self.lock:
+            endpoints = self.healthy
+            for endpoint in endpoints:
+                endpoint.in_use += 1
+
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*[probe(session, e) for e in endpoints])
+
+        logging.info(f"Healthy proxies: {len(self.healthy)}/{len(self)}")
+        self.save()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+import heapq
+import os
+import pickle
+import sys
+import tempfile
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+    List,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Maximum number of runs merged at once, more runs are merged in passes
+MAX_FAN_IN = 64
+
+
+def sizeof(item: Any) -> int:
+    """Estimate the memory held by an item in a sort buffer.
+
+    Arguments:
+        item: string or tuple of values
+
+    Returns:
+        estimated size in bytes (including the list slot)
+    """
+    size = sys.getsizeof(item) + 8
+    if isinstance(item, tuple):
+        size += sum(sys.getsizeof(i) for i in item)
+
+    return size
+
+
+def open_file_limit() -> int:
+    """Maximum number of files the process may have open at once
+
+    Returns:
+        soft open file limit (512 when it cannot be queried)
+    """
+    if resource is None:
+        return 512
+
+    (soft, _) = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return soft if soft != resource.RLIM_INFINITY else 4096
+
+
+class ExternalSorter(object):
+    """Sort (and optionally deduplicate) more items than fit in memory.
+    Items are buffered until a memory ceiling is reached, then spilled
+    to disk as a sorted run. Runs are combined with k-way merges of at
+    most `fan_in` runs at a time, and only the runs being merged are open.
+    """
+
+    # Number of items pickled together when spilling a run
+    BATCH_SIZE = 10000
+
+    def __init__(
+        self,
+        max_memory: int,
+        tmp_dir: str = None,
+        fan_in: int = MAX_FAN_IN,
+    ):
+        """Initialize ExternalSorter instance.
+
+        Arguments:
+            max_memory: memory ceiling of the sort buffer in bytes
+            tmp_dir: directory to spill sorted runs to
+            fan_in: maximum number of runs merged (i.e. open) at once
+        """
+        self.max_memory = max_memory
+        self.tmp_dir = tmp_dir
+        self.fan_in = max(2, fan_in)
+
+        self.buffer = []
+        self.buffer_size = 0
+        self.runs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(self, item: Any):
+        """Add an item, spilling a sorted run once the ceiling is reached.
+
+        Arguments:
+            item: item to sort
+        """
+        self.buffer.append(item)
+        self.buffer_size += sizeof(item)
+
+        if self.buffer_size >= self.max_memory:
+            self.__spill()
+
+    def __spill(self):
+        """Write the sorted buffer to disk as a run"""
+        self.buffer.sort()
+        self.runs.append(self.__write(self.buffer))
+
+        self.buffer = []
+        self.buffer_size = 0
+
+    def __write(self, items: Iterable[Any]) -> str:
+        """Write sorted items to a closed run file.
+
+        Arguments:
+            items: sorted items
+
+        Returns:
+            path of the run file
+        """
+        (fd, path) = tempfile.mkstemp(suffix=".run", dir=self.tmp_dir)
+        with os.fdopen(fd, "wb") as run:
+            batch = []
+            for item in items:
+                batch.append(item)
+                if len(batch) >= self.BATCH_SIZE:
+                    pickle.dump(batch, run, protocol=4)
+                    batch = []
+
+            if batch:
+                pickle.dump(batch, run, protocol=4)
+
+        return path
+
+    def __read(self, path: str) -> Iterator[Any]:
+        """Read a sorted run back from disk, keeping it open only while
+        it is being read.
+
+        Arguments:
+            path: run file
+
+        Yields:
+            sorted items
+        """
+        with open(path, "rb") as run:
+            while True:
+                try:
+                    yield from pickle.load(run)
+
+                except EOFError:
+                    return
+
+    def __remove(self, paths: List[str]):
+        """Delete run files"""
+        for path in paths:
+            try:
+                os.remove(path)
+
+            except FileNotFoundError:
+                pass
+
+    def __reduce(self):
+        """Merge runs in passes of `fan_in` runs until the remaining runs
+        (plus the buffer) can be merged at once"""
+        while len(self.runs) > self.fan_in - 1:
+            (group, self.runs) = (self.runs[: self.fan_in], self.runs[self.fan_in :])
+            merged = self.__write(heapq.merge(*[self.__read(p) for p in group]))
+
+            self.runs.append(merged)
+            self.__remove(group)
+
+    def sorted(self, unique: bool = False) -> Iterator[Any]:
+        """Merge the in-memory buffer and all spilled runs.
+
+        Arguments:
+            unique: drop repeated items
+
+        Yields:
+            items in sorted order
+        """
+        self.buffer.sort()
+        self.__reduce()
+
+        runs = [self.__read(path) for path in self.runs]
+        merged = heapq.merge(self.buffer, *runs) if runs else iter(self.buffer)
+
+        if not unique:
+            yield from merged
+            return
+
+        # Repeated items are adjacent once merged
+        last = object()
+        for item in merged:
+            if item != last:
+                yield item
+                last = item
+
+    def close(self):
+        """Remove spilled runs from disk"""
+        self.__remove(self.runs)
+
+        self.runs = []
+        self.buffer = []
+        self.buffer_size = 0
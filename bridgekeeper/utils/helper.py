@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 
 import string
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import (
     Any,
     Dict,
+    Iterator,
     List,
 )
 
@@ -111,3 +114,19 @@ def check_substring(s: str, sub: str) -> bool:
     sub_table = sub.maketrans(dict.fromkeys(remove_char_set))
 
     return sub.translate(sub_table) in s.translate(s_table)
+
+
+@contextmanager
+def timed(timings: Dict[str, float], stage: str) -> Iterator[None]:
+    """Add the wall-clock time of a block to a stage timing
+
+    Arguments:
+        timings: dictionary of stage -> seconds
+        stage: stage name
+    """
+    start = time.perf_counter()
+    try:
+        yield
+
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+import json
+import re
+import threading
+from typing import (
+    Any,
+    Dict,
+)
+from urllib.parse import urlsplit
+
+
+# API keys are never written to a recording
+SECRET_PARAMS = re.compile(r"(?<=[?&])(api_key)=[^&]*")
+
+
+def redact_url(url: str) -> str:
+    """Strip secrets (i.e. the Hunter.io API key) from a url so it can
+    be recorded and matched against recordings.
+
+    Arguments:
+        url: request url
+
+    Returns:
+        redacted url
+    """
+    return SECRET_PARAMS.sub(r"\1=REDACTED", url)
+
+
+def rewrite_url(url: str, endpoint: str) -> str:
+    """Point a request at a stand-in server instead of the real host,
+    keeping the original host as the first path segment so the server
+    can tell the search engines apart.
+
+    Arguments:
+        url: request url (i.e. `https://www.google.com/search?q=...`)
+        endpoint: base url of the stand-in server (i.e. `http://127.0.0.1:8080`)
+
+    Returns:
+        rewritten url (i.e. `http://127.0.0.1:8080/www.google.com/search?q=...`)
+    """
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{endpoint.rstrip('/')}/{parts.netloc}{parts.path or '/'}{query}"
+
+
+class Recorder(object):
+    """Append request/response pairs to an NDJSON recording so a run
+    can later be replayed without touching the live services.
+    """
+
+    def __init__(self, path: str):
+        """Initialize Recorder instance.
+
+        Arguments:
+            path: file to append the recording to
+        """
+        self.path = path
+        self.count = 0
+
+        # Hunter.io requests are sent from a different thread than the
+        # search engine coroutines
+        self.lock = threading.Lock()
+
+    def record(self, source: str, url: str, status: int, body: str):
+        """Record a single request/response pair.
+
+        Arguments:
+            source: search engine name or `Hunter`
+            url: original request url
+            status: response status code
+            body: response body
+        """
+        entry = {
+            "source": source.lower(),
+            "url": redact_url(url),
+            "status": status,
+            "body": body,
+        }
+
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+            self.count += 1
+
+
+def load_recording(path: str) -> Dict[str, Dict[str, Any]]:
+    """Load an NDJSON recording, the last response recorded for a url
+    wins.
+
+    Arguments:
+        path: recording file
+
+    Returns:
+        dictionary of redacted urls -> recorded entries
+    """
+    entries = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entries[entry["url"]] = entry
+
+    return entries
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import tempfile
+import unittest
+
+from bridgekeeper.core.scrape.cache import ResponseCache
+from bridgekeeper.core.scrape.engines.duckduckgo import DuckDuckGoEngine
+
+
+COMPANY = "Example Ltd."
+
+
+def duckduckgo_page(titles):
+    """DuckDuckGo result page (d.js) holding the given result titles"""
+    results = [{"t": t, "u": "https://www.linkedin.com/in/x"} for t in titles]
+    results = results or [{"t": "EOF", "u": ""}]
+    results = json.dumps(results, separators=(",", ":"))
+    return f"DDG.pageLayout.load('d',{results});".encode("utf-8")
+
+
+class TestDuckDuckGoCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def engine(self, offline=False, depth=5):
+        cache = ResponseCache(self.directory.name, offline=offline)
+        return DuckDuckGoEngine(COMPANY, depth=depth, cache=cache)
+
+    def cache_page(self, offset, token, titles):
+        engine = self.engine()
+        url = f"{engine.url}{offset}&vqd={token}"
+        key = engine.cache.key(engine.engine, engine._cache_url(url), engine.cookies)
+        engine.cache.put(key, duckduckgo_page(titles))
+
+    def test_page_hit_after_token_refresh(self):
+        self.cache_page(0, "4-old", ["John Smith - Engineer - Example Ltd. | LinkedIn"])
+
+        # No session: a cache miss would have to send a request and fail
+        engine = self.engine()
+        engine.token = "4-new"
+        response = asyncio.run(engine._http_req(f"{engine.url}0&vqd={engine.token}"))
+
+        self.assertIn(b"John Smith", response)
+        self.assertEqual(engine.requests, 0)
+
+    def test_offline_replay_without_token(self):
+        self.cache_page(0, "4-old", ["John Smith - Engineer - Example Ltd. | LinkedIn"])
+        self.cache_page(1, "4-old", [])
+
+        engine = self.engine(offline=True)
+        names = asyncio.run(engine.run())
+
+        self.assertEqual(names, ["John Smith"])
+        self.assertEqual(engine.requests, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from bridgekeeper.core.rank import rank
+
+
+class TestRank(unittest.TestCase):
+    def test_duplicates_after_unnumbered(self):
+        ranked = rank(
+            "{f}{last}",
+            ["John Smith", "Jane Smith", "Amy Doe"],
+            sightings={"Jane Smith": 3},
+        )
+
+        self.assertEqual(ranked, ["JSmith", "ADoe", "JSmith1"])
+
+    def test_overlapping_templates(self):
+        names = ["John Smith", "Jane Doe"]
+
+        ranked = rank("{f}{last},{first}[1]{last}", names)
+        self.assertEqual(ranked, ["JSmith", "JDoe"])
+
+        # Usernames rendered by both templates count once against the top
+        ranked = rank("{f}{last},{first}[1]{last},{first}{l}", names, top=3)
+        self.assertEqual(ranked, ["JSmith", "JDoe", "JohnS"])
+
+    def test_overlap_ranks_best(self):
+        # `JSmith` is the first template's username of `J Smith`, ranked
+        # ahead of the same username of the second template
+        ranked = rank(
+            "{f}{last},{first}{last}",
+            ["John Smith", "J Smith"],
+            scores={"{first}{last}": 1.0},
+        )
+
+        self.assertEqual(ranked, ["JohnSmith", "JSmith", "JSmith1"])
+
+    def test_known_usernames_first(self):
+        ranked = rank("{f}{last}", ["John Smith"], known=["JSmith", "ADoe"])
+
+        self.assertEqual(ranked, ["JSmith", "ADoe"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+from bridgekeeper.core.transform.wordlist import WordlistGenerator
+
+
+NAMES = ["John Smith", "Jane Smith", "Amy Doe", "Bob Jones"]
+TEMPLATES = ["{f}{last}", "{first}.{last}"]
+DOMAINS = ["example.com", "example.org"]
+
+
+class TestWordlistResume(unittest.TestCase):
+    def setUp(self):
+        self.generator = WordlistGenerator(TEMPLATES, NAMES, domains=DOMAINS)
+        self.expected = list(self.generator.generate())
+
+        (fd, self.output_file) = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.output_file)
+
+    def read(self):
+        with open(self.output_file) as f:
+            return f.read().splitlines()
+
+    def test_resume_partial_file(self):
+        self.generator.write(self.output_file, limit=7)
+        self.generator.write(self.output_file, offset=7)
+
+        self.assertEqual(self.read(), self.expected)
+
+    def test_resume_complete_file(self):
+        self.generator.write(self.output_file)
+        count = self.generator.write(self.output_file, offset=7)
+
+        self.assertEqual(count, len(self.expected) - 7)
+        self.assertEqual(self.read(), self.expected)
+
+    def test_resume_cut_off_line(self):
+        self.generator.write(self.output_file, limit=7)
+        with open(self.output_file, "a") as f:
+            f.write("JSmi")
+
+        self.generator.write(self.output_file, offset=7)
+
+        self.assertEqual(self.read(), self.expected)
+
+    def test_resume_short_file(self):
+        self.generator.write(self.output_file, limit=5)
+
+        with self.assertRaises(ValueError):
+            self.generator.write(self.output_file, offset=7)
+
+        self.assertEqual(self.read(), self.expected[:5])
+
+    def test_resume_missing_file(self):
+        os.remove(self.output_file)
+
+        with self.assertRaises(ValueError):
+            self.generator.write(self.output_file, offset=7)
+
+        open(self.output_file, "w").close()
+
+
+if __name__ == "__main__":
+    unittest.main()